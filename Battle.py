@@ -0,0 +1,185 @@
+import os
+import random
+from array import array
+
+import numpy as np
+
+from Damage import DamageCalculator, LEVEL, NO_TYPE, STAB
+from Pokedex import resolve_rows
+from ProcessPool import start_pool, worker_data
+
+
+# Moves stronger than this are mostly Z-Moves, Max Moves and moves that make the user faint,
+# which follow rules the simulator does not model
+MAX_POWER = 150
+MOVESET_SIZE = 4
+
+# A battle still going after this many turns, such as two Pokémon immune to each other, is a draw
+MAX_TURNS = 200
+CRITICAL_CHANCE = 1 / 24
+CRITICAL_MULTIPLIER = 1.5
+BATCH_SIZE = 250
+MAX_TEAM_SIZE = 6
+
+
+class BattleData:
+    """Level 50 stats, types and usable moves as flat arrays, copied once into every worker process."""
+
+    __slots__ = ("names", "ids", "hp", "attack", "defense", "special_attack",
+                 "special_defense", "speed", "type_pairs", "effectiveness", "move_types", "move_special",
+                 "move_power", "move_accuracy", "moves", "moves_by_type")
+
+    def __init__(self, repository):
+        calculator = DamageCalculator(repository)
+        self.names = calculator.names
+        self.ids = array('i', calculator.ids.tolist())
+
+        # Plain arrays of Python numbers, which are faster than NumPy for one value at a time
+        self.hp = array('d', calculator.hp.tolist())
+        self.attack = array('d', calculator.attack.tolist())
+        self.defense = array('d', calculator.defense.tolist())
+        self.special_attack = array('d', calculator.special_attack.tolist())
+        self.special_defense = array('d', calculator.special_defense.tolist())
+        speeds = repository.fetchall("SELECT Speed FROM Pokemon ORDER BY ID")
+        self.speed = array('d', [speed + 5 for speed, in speeds])
+        self.type_pairs = [tuple(pair) for pair in calculator.type_pairs.tolist()]
+        self.effectiveness = [array('d', row) for row in calculator.effectiveness.tolist()]
+
+        self.move_types = array('i', calculator.move_types.tolist())
+        self.move_special = array('b', calculator.move_special.tolist())
+        self.move_power = array('d', calculator.move_power.tolist())
+        self.move_accuracy = array('d', calculator.move_accuracy.tolist())
+
+        # Movesets are drawn from these, with one move of each of the Pokémon's own types when there is one
+        self.moves = [move for move in range(len(self.move_power)) if self.move_power[move] <= MAX_POWER]
+        self.moves_by_type = {}
+        for move in self.moves:
+            self.moves_by_type.setdefault(self.move_types[move], []).append(move)
+
+    def resolve_team(self, keys):
+        """Turns a list of names or IDs into rows; raises ValueError for unknown entries or a bad team size."""
+        rows = resolve_rows(keys, self.ids, self.names)
+        if not 1 <= len(rows) <= MAX_TEAM_SIZE:
+            raise ValueError(f"A team needs between 1 and {MAX_TEAM_SIZE} Pokémon.")
+        return rows
+
+
+class BattleState:
+    """The state of one battle: both teams, their remaining HP, active Pokémon and movesets."""
+
+    __slots__ = ("teams", "hp", "active", "movesets", "choices")
+
+    def __init__(self, data, team_a, team_b, rng):
+        self.teams = (array('i', team_a), array('i', team_b))
+        self.hp = tuple(array('d', [data.hp[row] for row in team]) for team in self.teams)
+        self.active = array('i', [0, 0])
+        self.movesets = tuple([draw_moveset(data, row, rng) for row in team] for team in self.teams)
+
+        # Best move and its damage for each (side, attacker slot, defender slot), filled in as matchups happen
+        self.choices = {}
+
+
+def draw_moveset(data, row, rng):
+    moveset = [rng.choice(data.moves_by_type[type_index]) for type_index in data.type_pairs[row]
+               if type_index != NO_TYPE and type_index in data.moves_by_type]
+    while len(moveset) < MOVESET_SIZE:
+        move = rng.choice(data.moves)
+        if move not in moveset:
+            moveset.append(move)
+    return moveset
+
+
+def choose_move(data, state, side, attacker_slot, defender_slot):
+    # Picks the move with the highest expected damage and returns (hit chance, damage before the roll)
+    key = (side, attacker_slot, defender_slot)
+    choice = state.choices.get(key)
+    if choice is not None:
+        return choice
+    attacker = state.teams[side][attacker_slot]
+    defender = state.teams[1 - side][defender_slot]
+
+    choice = (0.0, 0.0)
+    best = -1.0
+    for move in state.movesets[side][attacker_slot]:
+        if data.move_special[move]:
+            attack, defense = data.special_attack[attacker], data.special_defense[defender]
+        else:
+            attack, defense = data.attack[attacker], data.defense[defender]
+        damage = (2 * LEVEL / 5 + 2) * data.move_power[move] * attack / defense / 50 + 2
+        damage *= data.effectiveness[data.move_types[move]][defender]
+        if data.move_types[move] in data.type_pairs[attacker]:
+            damage *= STAB
+        if damage * data.move_accuracy[move] > best:
+            best = damage * data.move_accuracy[move]
+            choice = (data.move_accuracy[move], damage)
+    state.choices[key] = choice
+    return choice
+
+
+def simulate_battle(data, team_a, team_b, rng):
+    """Plays one battle between two lists of rows and returns (winner, turns); winner is 0, 1 or None."""
+    state = BattleState(data, team_a, team_b, rng)
+    hp, active = state.hp, state.active
+    for turn in range(1, MAX_TURNS + 1):
+        speed_a = data.speed[state.teams[0][active[0]]]
+        speed_b = data.speed[state.teams[1][active[1]]]
+        first = 0 if speed_a > speed_b or (speed_a == speed_b and rng.random() < 0.5) else 1
+
+        for side in (first, 1 - first):
+            other = 1 - side
+            hit_chance, damage = choose_move(data, state, side, active[side], active[other])
+            if rng.random() >= hit_chance:
+                continue
+            damage *= rng.uniform(0.85, 1.0)
+            if rng.random() < CRITICAL_CHANCE:
+                damage *= CRITICAL_MULTIPLIER
+
+            hp[other][active[other]] -= damage
+            if hp[other][active[other]] <= 0:
+                # A fainted Pokémon does not get its attack this turn; the next one comes in
+                active[other] += 1
+                if active[other] == len(state.teams[other]):
+                    return side, turn
+                break
+    return None, MAX_TURNS
+
+
+def simulate_batch(team_a, team_b, count, seed, data=None):
+    """Runs count battles and returns (wins for A, wins for B, draws, turns).
+
+    An empty team_b means a new random opponent team of the same size for every battle.
+    """
+    data = worker_data(data)
+    rng = random.Random(seed)
+    results = [0, 0, 0]
+    turns = 0
+    for _ in range(count):
+        opponents = team_b or rng.sample(range(len(data.ids)), len(team_a))
+        winner, battle_turns = simulate_battle(data, team_a, opponents, rng)
+        results[2 if winner is None else winner] += 1
+        turns += battle_turns
+    return results[0], results[1], results[2], turns
+
+
+def batch_seeds(seed, batches):
+    # Every batch gets its own independent seed, so results depend only on the seed and not on
+    # which worker ran which batch or in what order they finished
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(batches)]
+
+
+class BattleSimulator:
+    """Runs battles in batches on a pool of worker processes, each holding one copy of the BattleData."""
+
+    def __init__(self, data, max_workers=None):
+        self.data = data
+        self.max_workers = max_workers or os.cpu_count()
+        self.executor = start_pool(data, self.max_workers)
+
+    def submit(self, team_a, team_b, battles, seed=0, batch_size=BATCH_SIZE):
+        """Queues the battles and returns one future per batch, each resolving to simulate_batch's result."""
+        counts = [min(batch_size, battles - start) for start in range(0, battles, batch_size)]
+        return [self.executor.submit(simulate_batch, team_a, team_b, count, batch_seed)
+                for count, batch_seed in zip(counts, batch_seeds(seed, len(counts)))]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,540 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from Repository import PokedexRepository, DEFAULT_DB_PATH
+from Instrumentation import memory_usage
+
+
+def time_per_call(func, iterations):
+    # Returns the average time of one call in microseconds
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_lookups(iterations=2000):
+    """Compares a fresh connection per lookup against the shared repository."""
+    repository = PokedexRepository()
+    max_id = repository.max_id
+
+    def connect_per_lookup(i):
+        conn = sqlite3.connect(DEFAULT_DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(ID) FROM Pokemon")
+        cursor.fetchone()
+        cursor.execute("SELECT * FROM Pokemon WHERE ID = ?", (i % max_id + 1,))
+        cursor.fetchone()
+        conn.close()
+
+    def shared_connection(i):
+        repository.fetch_pokemon_by_id(i % repository.max_id + 1)
+
+    before = time_per_call(connect_per_lookup, iterations)
+    after = time_per_call(shared_connection, iterations)
+    repository.close()
+    print(f"Lookup by ID: {before:.1f} us per call before, {after:.1f} us per call after "
+          f"({before / after:.0f}x faster)")
+
+
+def bench_type_search(iterations=2000):
+    """Compares the old LIKE scan against the indexed type search."""
+    repository = PokedexRepository()
+    types = ["Fire", "Water", "Grass", "Dragon", "Fairy"]
+
+    def like_scan(i):
+        repository.fetchall("SELECT * FROM Pokemon WHERE Upper(Type) LIKE(?)", (f'%{types[i % 5]}%',))
+
+    def indexed(i):
+        repository.search_pokemon_by_type(types[i % 5])
+
+    before = time_per_call(like_scan, iterations)
+    after = time_per_call(indexed, iterations)
+    repository.close()
+    print(f"Type search: {before:.1f} us per call before, {after:.1f} us per call after")
+
+
+def bench_name_search(iterations=2000):
+    """Times one keystroke of search-as-you-type against the Pokémon and move name indexes."""
+    from NameIndex import NameIndex
+
+    repository = PokedexRepository()
+    start = time.perf_counter()
+    pokemon_index = NameIndex(repository.pokemon_names())
+    move_index = NameIndex(repository.move_names())
+    build = (time.perf_counter() - start) * 1e3
+    repository.close()
+
+    # Prefix keystrokes and misspellings that fall back to the fuzzy search
+    queries = ["p", "pik", "char", "charzard", "bulbsaur", "thunderblot", "flamethrowr", "zzzz"]
+
+    def keystroke(i):
+        query = queries[i % len(queries)]
+        pokemon_index.search(query)
+        move_index.search(query)
+
+    per_keystroke = time_per_call(keystroke, iterations)
+    print(f"Name search: index built in {build:.1f} ms, {per_keystroke:.1f} us per keystroke")
+
+
+def bench_stats(iterations=2000):
+    """Compares ranking with a SQL ORDER BY against the in-memory stats matrix."""
+    from Stats import StatsEngine
+
+    repository = PokedexRepository()
+    start = time.perf_counter()
+    engine = StatsEngine(repository)
+    build = (time.perf_counter() - start) * 1e3
+    max_id = repository.max_id
+
+    def order_by(i):
+        repository.fetchall("SELECT ID FROM Pokemon ORDER BY Spatk + Speed DESC LIMIT 25")
+
+    def ranked(i):
+        engine.rank("Special attacker")
+
+    def similar(i):
+        engine.percentiles_of(i % max_id + 1)
+        engine.similar(i % max_id + 1)
+
+    before = time_per_call(order_by, iterations)
+    after = time_per_call(ranked, iterations)
+    per_pokemon = time_per_call(similar, iterations)
+    repository.close()
+    print(f"Stats: matrix built in {build:.1f} ms, ranking {before:.1f} us with SQL, {after:.1f} us vectorized, "
+          f"{per_pokemon:.1f} us for percentiles and similar Pokémon")
+
+
+def bench_damage(iterations=500):
+    """Times the two damage tables, which are recalculated on every selection change."""
+    from Damage import DamageCalculator
+
+    repository = PokedexRepository()
+    start = time.perf_counter()
+    calculator = DamageCalculator(repository)
+    build = (time.perf_counter() - start) * 1e3
+    max_id = repository.max_id
+    repository.close()
+
+    def moves_against(i):
+        calculator.moves_against(i % max_id + 1, (i * 7) % max_id + 1)
+
+    def move_against_all(i):
+        calculator.move_against_all(i % max_id + 1, calculator.move_names[i % len(calculator.move_names)])
+
+    per_pair = time_per_call(moves_against, iterations)
+    per_move = time_per_call(move_against_all, iterations)
+    print(f"Damage: tables built in {build:.1f} ms, {per_pair:.1f} us for {len(calculator.move_names)} moves "
+          f"on one defender, {per_move:.1f} us for one move on {len(calculator.ids)} defenders")
+
+
+def bench_battles(battles=4000):
+    """Reports simulated turns per second in this process and on the worker pool."""
+    from Battle import BattleData, BattleSimulator, simulate_batch
+
+    repository = PokedexRepository()
+    data = BattleData(repository)
+    repository.close()
+    team_a = data.resolve_team(["Garchomp", "Tyranitar", "Gengar"])
+    team_b = data.resolve_team(["Dragonite", "Metagross", "Blastoise"])
+
+    start = time.perf_counter()
+    turns = simulate_batch(team_a, team_b, battles, 0, data=data)[3]
+    in_process = turns / (time.perf_counter() - start)
+
+    # The pool is warmed up first so process start-up is not counted
+    simulator = BattleSimulator(data)
+    for future in simulator.submit(team_a, team_b, 1):
+        future.result()
+    start = time.perf_counter()
+    turns = sum(future.result()[3] for future in simulator.submit(team_a, team_b, battles))
+    pooled = turns / (time.perf_counter() - start)
+    simulator.shutdown()
+    print(f"Battles: {in_process:,.0f} turns per second in one process, {pooled:,.0f} on "
+          f"{simulator.max_workers} worker processes")
+
+
+def bench_team_builder():
+    """Times the team beam search, with and without constraints, on the worker pool."""
+    from TeamBuilder import TeamData, TeamBuilder
+
+    repository = PokedexRepository()
+    data = TeamData(repository)
+    repository.close()
+    builder = TeamBuilder(data)
+
+    # The first search also starts the worker processes
+    start = time.perf_counter()
+    builder.search(top=10)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    builder.search(top=10)
+    unconstrained = time.perf_counter() - start
+    start = time.perf_counter()
+    builder.search(top=10, banned_types=["Dragon", "Steel"], min_speed=90, required=["Pikachu"])
+    constrained = time.perf_counter() - start
+    builder.shutdown()
+    print(f"Team builder: {len(data.candidates())} of {len(data.ids)} Pokémon searched, {first:.2f} s for the "
+          f"first search, {unconstrained:.2f} s after, {constrained:.2f} s with constraints")
+
+
+def bench_evolutions(iterations=500):
+    """Compares walking an evolution chain one query per hop against the cached evolution graph."""
+    from Evolutions import EvolutionGraph, evolution_targets
+
+    repository = PokedexRepository()
+    start = time.perf_counter()
+    EvolutionGraph.build(repository)
+    build = (time.perf_counter() - start) * 1e3
+    EvolutionGraph.load(repository)
+    start = time.perf_counter()
+    graph = EvolutionGraph.load(repository)
+    cached = (time.perf_counter() - start) * 1e3
+    max_id = repository.max_id
+
+    def per_hop(i):
+        # Forward only, as the column has no reverse direction
+        pending = [repository.fetch_pokemon_by_id(i % max_id + 1)]
+        while pending:
+            row = pending.pop()
+            pending.extend(filter(None, (repository.fetch_pokemon_by_name(name)
+                                         for name in evolution_targets(row[10]))))
+
+    def from_graph(i):
+        graph.family(i % max_id + 1)
+
+    before = time_per_call(per_hop, iterations)
+    after = time_per_call(from_graph, iterations)
+    repository.close()
+    print(f"Evolutions: graph built in {build:.1f} ms, loaded from cache in {cached:.1f} ms, "
+          f"{before:.1f} us per chain one query per hop, {after:.1f} us per whole family from the graph")
+
+
+def bench_ingest():
+    """Times a full rebuild of every Pokémon and move row, then a run where nothing changed."""
+    import shutil
+    from Ingest import ingest_rows, POKEMON_COLUMNS, MOVE_COLUMNS
+
+    repository = PokedexRepository()
+    pokemon_rows = repository.fetchall(f"SELECT {', '.join(POKEMON_COLUMNS)} FROM Pokemon")
+    move_rows = repository.fetchall(f"SELECT {', '.join(MOVE_COLUMNS)} FROM Moves")
+    repository.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "Data.db")
+        shutil.copy(DEFAULT_DB_PATH, db_path)
+        conn = sqlite3.connect(db_path)
+        for table in ("Pokemon", "Moves", "PokemonTypes"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+        conn.close()
+
+        start = time.perf_counter()
+        ingest_rows(db_path, pokemon_rows, move_rows)
+        full = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        summary = ingest_rows(db_path, pokemon_rows, move_rows)
+        unchanged = (time.perf_counter() - start) * 1e3
+    assert summary["pokemon"][1] == summary["moves"][1] == 0, "Unchanged rows were rewritten"
+    print(f"Ingest: {len(pokemon_rows)} Pokémon and {len(move_rows)} moves written in {full:.1f} ms, "
+          f"{unchanged:.1f} ms when nothing changed")
+
+
+def bench_images(iterations=200):
+    """Compares decoding and scaling the original JPEG against the pixmap cache."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QPixmap
+    from ImageCache import IMAGES_DIR, PixmapCache, ThumbnailStore
+
+    def decode_original(i):
+        pixmap = QPixmap(os.path.join(IMAGES_DIR, f'{i % 10 + 1}.jpg'))
+        pixmap.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    with tempfile.TemporaryDirectory() as thumbnails_dir:
+        cold_cache = PixmapCache(ThumbnailStore(thumbnails_dir=thumbnails_dir))
+        warm_cache = PixmapCache(ThumbnailStore(thumbnails_dir=thumbnails_dir), capacity=0)
+        cached = PixmapCache(ThumbnailStore(thumbnails_dir=thumbnails_dir))
+
+        before = time_per_call(decode_original, iterations)
+        first_view = time_per_call(lambda i: cold_cache.get(i + 1), 10)
+        thumbnail = time_per_call(lambda i: warm_cache.get(i % 10 + 1), iterations)
+        repeat_view = time_per_call(lambda i: cached.get(i % 10 + 1), iterations)
+
+    print(f"Image load: {before:.1f} us decoding the original, {first_view:.1f} us on first view, "
+          f"{thumbnail:.1f} us from the thumbnail store, {repeat_view:.1f} us from memory "
+          f"(hits {cached.hits}, misses {cached.misses})")
+
+
+def open_file_count():
+    # Number of file descriptors this process has open, on Linux
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def bench_sprite_archive(count=200):
+    """Compares cold image loads from the loose JPEGs against the packed sprite archive."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+    from ImageCache import IMAGES_DIR
+    from SpriteArchive import SpriteArchive, DEFAULT_ARCHIVE_PATH, build_archive
+
+    # Builds the archive if it is missing or was packed by an older version
+    existing = SpriteArchive.open_default()
+    if existing is None:
+        build_archive()
+    else:
+        existing.close()
+
+    def load_loose(i):
+        image = QImage(os.path.join(IMAGES_DIR, f'{i + 1}.jpg'))
+        image.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+    files_before = open_file_count()
+    start = time.perf_counter()
+    archive = SpriteArchive()
+    open_time = (time.perf_counter() - start) * 1e3
+    files_with_archive = open_file_count()
+
+    loose = time_per_call(load_loose, count)
+    packed = time_per_call(lambda i: archive.load(i + 1), count)
+    archive.close()
+
+    loose_size = sum(entry.stat().st_size for entry in os.scandir(IMAGES_DIR)) // 1024
+    packed_size = os.path.getsize(DEFAULT_ARCHIVE_PATH) // 1024
+    print(f"Sprite archive: {loose:.1f} us per cold load from loose files, {packed:.1f} us from the archive "
+          f"(opened in {open_time:.2f} ms, {files_with_archive - files_before} extra open files); "
+          f"{loose_size} KB of loose files, {packed_size} KB archive")
+
+
+def bench_restyle(iterations=200):
+    """Compares restyling the whole window per lookup against the precomputed type theme."""
+    from PyQt5.QtWidgets import QApplication, QPushButton
+    from Core import MainWindow
+    from Theme import TYPE_COLORS
+
+    types = list(TYPE_COLORS) + ["Grass/Poison", "Fire/Flying", "Water/Ground"]
+
+    def build_window():
+        window = MainWindow()
+        window.show()
+        window.show_search_screen()
+        window.show_move_search_screen()
+        QApplication.processEvents()
+        return window
+
+    old_window = build_window()
+    new_window = build_window()
+
+    def restyle_window(i):
+        old_window.setStyleSheet(f"background-color: {TYPE_COLORS.get(types[i % len(types)], '#2c3e50')};")
+        for button in old_window.findChildren(QPushButton):
+            button.setStyleSheet("color: black; background-color: #f0f0f0;")
+        QApplication.processEvents()
+
+    def restyle_background(i):
+        new_window.update_palette_for_type(types[i % len(types)])
+        QApplication.processEvents()
+
+    before = time_per_call(restyle_window, iterations)
+    after = time_per_call(restyle_background, iterations)
+    old_window.close()
+    new_window.close()
+    print(f"Restyle per lookup: {before:.1f} us before, {after:.1f} us after")
+
+
+def soak_screens(iterations=5000):
+    """Switches between every screen many times, evicting and rebuilding them, and reports widget count and memory."""
+    from PyQt5.QtCore import QEvent
+    from PyQt5.QtWidgets import QApplication, QWidget
+    from Core import MainWindow
+
+    window = MainWindow()
+
+    # The app has room for every screen, so a lower capacity makes each cycle evict and rebuild some of them
+    window.screens.capacity = 2
+    switches = [
+        window.show_search_screen,
+        window.show_move_search_screen,
+        window.show_damage_screen,
+        window.show_simulator_screen,
+        window.show_team_builder_screen,
+        window.show_diagnostics_screen,
+        window.show_main_menu,
+    ]
+
+    samples = []
+    for i in range(iterations):
+        switches[i % len(switches)]()
+
+        # Lets deleteLater run after every switch, as the app's event loop would; outside a running
+        # event loop, processEvents alone leaves deferred deletes queued and evicted screens pile up
+        QApplication.processEvents()
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        if i % (iterations // 5) == 0 or i == iterations - 1:
+            samples.append((i + 1, len(window.findChildren(QWidget)), *memory_usage()))
+
+    window.close()
+    for switch_count, widgets, memory, memory_kind in samples:
+        print(f"Screen soak: after {switch_count} switches, {widgets} widgets, {memory} KB {memory_kind}")
+
+
+def percentile(samples, fraction):
+    # Nearest-rank percentile, so the p99 of a session is a latency that really happened
+    ordered = sorted(samples)
+    return ordered[min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1]
+
+
+def run_session(window, steps):
+    """Runs each step and returns how long it took until its result was on screen, in milliseconds."""
+    from PyQt5.QtWidgets import QApplication
+
+    latencies = []
+    for step in steps:
+        start = time.perf_counter()
+        step()
+        # Waits for the step's query and image load to reach the screen, then lets it paint
+        window.tasks.wait_for_done()
+        QApplication.processEvents()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def bench_sessions(results_path=None, baseline_path=None, tolerance=1.5):
+    """Scripts arrow-key sweeps over every ID, type searches and move searches in the real window.
+
+    Reports p50/p99 latency per session, the instrumented operations and memory. With results_path
+    the report is saved as JSON; with baseline_path, a session whose p99 is more than tolerance
+    times the saved one is reported as a regression. Returns False if there was one.
+    """
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtTest import QTest
+    from Core import MainWindow
+    from Pokedex import POKEMON_TYPES
+
+    memory_before, memory_kind = memory_usage()
+    window = MainWindow()
+    window.show()
+    window.show_search_screen()
+    window.search_bar.setText(str(window.repository.min_id))
+    window.search_pokemon()
+    window.tasks.wait_for_done()
+    memory_loaded = memory_usage()[0]
+
+    # Keys go to the stats label, which leaves the arrows to the search screen's shortcuts
+    window.stats_display.setFocus()
+    pokemon_count = window.repository.max_id - window.repository.min_id
+    window.instrumentation.reset()
+
+    def press(key):
+        return lambda: QTest.keyClick(window.stats_display, key)
+
+    def search_pokemon_type(pokemon_type):
+        def step():
+            window.type_combo_box.setCurrentText(pokemon_type)
+            window.search_pokemon_by_type()
+        return step
+
+    def search_move_name(move_name):
+        def step():
+            window.move_search_bar.setText(move_name)
+            window.search_moves_by_name()
+        return step
+
+    def search_move_type(move_type):
+        def step():
+            window.move_type_combo_box.setCurrentText(move_type)
+            window.search_moves_by_type()
+        return step
+
+    def filter_moves(min_power):
+        def step():
+            window.move_type_combo_box.setCurrentIndex(0)
+            window.min_power_spin_box.setValue(min_power)
+            window.filter_moves()
+        return step
+
+    sessions = {
+        "arrow sweep right": lambda: [press(Qt.Key_Right)] * pokemon_count,
+        "arrow sweep left": lambda: [press(Qt.Key_Left)] * pokemon_count,
+        "pokemon type search": lambda: [search_pokemon_type(pokemon_type) for pokemon_type in POKEMON_TYPES],
+        "move name search": lambda: [search_move_name(name) for name in window.repository.move_names()[::10]],
+        "move type search": lambda: [search_move_type(move_type) for move_type in POKEMON_TYPES],
+        "move filter": lambda: [filter_moves(min_power) for min_power in range(0, 250, 10)],
+    }
+
+    report = {"sessions": {}}
+    for name, steps in sessions.items():
+        if name == "move name search":
+            window.show_move_search_screen()
+        latencies = run_session(window, steps())
+        report["sessions"][name] = {"count": len(latencies), "p50_ms": percentile(latencies, 0.50),
+                                    "p99_ms": percentile(latencies, 0.99), "max_ms": max(latencies)}
+    assert window.current_pokemon_id == window.repository.min_id, "The arrow sweeps did not cover every ID"
+
+    report["operations"] = window.instrumentation.snapshot()["operations"]
+    report["memory_kb"] = {"before": memory_before, "loaded": memory_loaded, "after": memory_usage()[0],
+                           "kind": memory_kind}
+    window.close()
+
+    for name, session in report["sessions"].items():
+        print(f"Session {name}: {session['count']} steps, p50 {session['p50_ms']:.2f} ms, "
+              f"p99 {session['p99_ms']:.2f} ms, max {session['max_ms']:.2f} ms")
+    for operation, histogram in report["operations"].items():
+        print(f"  {operation}: {histogram['count']} calls, p50 {histogram['p50_ms']:.2f} ms, "
+              f"p99 {histogram['p99_ms']:.2f} ms, max {histogram['max_ms']:.2f} ms")
+    memory = report["memory_kb"]
+    print(f"Session memory ({memory['kind']}): {memory['before']} KB before the window, {memory['loaded']} KB "
+          f"loaded, {memory['after']} KB after every session")
+
+    if results_path:
+        with open(results_path, "w", encoding="utf-8") as results:
+            json.dump(report, results, indent=2)
+
+    passed = True
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        for name, session in baseline["sessions"].items():
+            current = report["sessions"].get(name)
+            if current is not None and current["p99_ms"] > session["p99_ms"] * tolerance:
+                print(f"Regression in {name}: p99 {current['p99_ms']:.2f} ms against {session['p99_ms']:.2f} ms")
+                passed = False
+    return passed
+
+
+if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    parser = argparse.ArgumentParser(description="Run the benchmarks, offscreen with QT_QPA_PLATFORM=offscreen.")
+    parser.add_argument("--sessions", action="store_true", help="only run the scripted session benchmarks")
+    parser.add_argument("--json", help="save the session report to this file")
+    parser.add_argument("--baseline", help="session report to compare against; a slower p99 exits with status 1")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="how many times the baseline p99 a session may take before it counts as a regression")
+    args = parser.parse_args()
+    app = QApplication([])
+
+    if args.sessions:
+        sys.exit(0 if bench_sessions(args.json, args.baseline, args.tolerance) else 1)
+
+    bench_lookups()
+    bench_type_search()
+    bench_name_search()
+    bench_stats()
+    bench_damage()
+    bench_battles()
+    bench_team_builder()
+    bench_evolutions()
+    bench_ingest()
+    bench_images()
+    bench_sprite_archive()
+    bench_restyle()
+    soak_screens()
+    sys.exit(0 if bench_sessions(args.json, args.baseline, args.tolerance) else 1)
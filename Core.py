@@ -1,5 +1,7 @@
-import sqlite3
-import os
+import logging
+import threading
+import time
+
 from PyQt5.QtWidgets import (
     QApplication,
     QLabel,
@@ -11,12 +13,43 @@ from PyQt5.QtWidgets import (
     QHBoxLayout,
     QTextEdit,
     QComboBox,
+    QSpinBox,
+    QCompleter,
+    QTableView,
+    QAbstractItemView,
+    QProgressBar,
+    QHeaderView,
+    QShortcut,
+    QFileDialog,
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QPalette, QColor, QPixmap
+from PyQt5.QtCore import Qt, QTimer, QStringListModel, pyqtSignal
+from PyQt5.QtGui import QFont, QPalette, QColor, QKeySequence
+from Repository import PokedexRepository, DEFAULT_DB_PATH, MOVE_SORT_COLUMNS
+from Pokedex import POKEMON_TYPES, format_pokemon, format_move
+from ImageCache import PixmapCache, ThumbnailStore
+from SpriteArchive import SpriteArchive
+from Prefetch import Prefetcher
+from Workers import TaskRunner, BatchRunner
+from NameIndex import NameIndex
+from Stats import StatsEngine, STAT_NAMES, RANKING_PRESETS
+from Damage import DamageCalculator, DAMAGE_HEADERS, TARGET_HEADERS
+from Battle import BattleData, BattleSimulator, BATCH_SIZE
+from TeamBuilder import TeamData, TeamBuilder, TEAM_HEADERS
+from Evolutions import EvolutionGraph
+from Screens import ScreenRegistry
+from Theme import TypeTheme, TYPE_COLORS
+from ResultsModel import ResultsTableModel, POKEMON_HEADERS, MOVE_HEADERS
+from Instrumentation import Instrumentation, DIAGNOSTICS_HEADERS
+
+
+logger = logging.getLogger(__name__)
+
 
 class MainWindow(QWidget):
-    def __init__(self):
+    # Emitted from the team search's thread with the percentage done and delivered on the GUI thread
+    team_search_progress = pyqtSignal(int)
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
         super().__init__()
 
         # Sets up the main window properties
@@ -29,27 +62,60 @@ class MainWindow(QWidget):
         palette.setColor(QPalette.WindowText, Qt.white)
         self.setPalette(palette)
 
-        # Define colors for different Pokémon types
-        self.type_colors = {
-            "Fire": "#FF4500",  # Red-orange
-            "Water": "#1E90FF",  # Blue
-            "Grass": "#32CD32",  # Green
-            "Electric": "#FFD700",  # Yellow
-            "Ice": "#ADD8E6",  # Light Blue
-            "Fighting": "#8B0000",  # Dark Red
-            "Flying": "#87CEEB",  # Sky Blue
-            "Poison": "#9400D3",  # Purple
-            "Ground": "#DEB887",  # Light Brown
-            "Rock": "#A52A2A",  # Brown
-            "Bug": "#9ACD32",  # Yellow-green
-            "Ghost": "#4B0082",  # Indigo
-            "Steel": "#B0C4DE",  # Light Steel Blue
-            "Dragon": "#4682B4",  # Steel Blue
-            "Dark": "#2F4F4F",  # Dark Slate Gray
-            "Fairy": "#FFB6C1",  # Light Pink
-            "Normal": "#D3D3D3",  # Light Gray
-            "Psychic": "#FF69B4",  # Hot Pink
-        }
+        # Times queries, image loads, restyles and renders for the diagnostics screen
+        self.instrumentation = Instrumentation()
+
+        # Opens the shared database connection used by every lookup
+        self.repository = PokedexRepository(db_path, instrumentation=self.instrumentation)
+
+        # Keeps recently shown artwork in memory, backed by the packed sprite archive when it has
+        # been built and by on-disk thumbnails of the loose images otherwise
+        thumbnail_store = ThumbnailStore()
+        self.pixmap_cache = PixmapCache(SpriteArchive.open_default(fallback=thumbnail_store) or thumbnail_store)
+
+        # Decoding is timed on whichever thread does it, the image channel's or the prefetcher's
+        self.pixmap_cache.store.load = self.instrumentation.wrap("image.load", self.pixmap_cache.store.load)
+
+        # Loads the neighbouring Pokémon in the background while browsing with the arrows
+        self.prefetcher = Prefetcher(self.repository, self.pixmap_cache, parent=self)
+
+        # Runs database queries and image decoding off the GUI thread
+        self.tasks = TaskRunner(parent=self)
+        self.tasks.failed.connect(self.on_task_failed)
+
+        # Simulations and team searches take seconds, so they get their own threads and never hold up lookups
+        self.jobs = TaskRunner(parent=self)
+
+        # Builds the name indexes once so search-as-you-type never touches the database
+        self.pokemon_name_index = NameIndex(self.repository.pokemon_names())
+        self.move_name_index = NameIndex(self.repository.move_names())
+
+        # Loads every base stat into one matrix for rankings, percentiles and similar Pokémon
+        self.stats_engine = StatsEngine(self.repository)
+
+        # Evolution families come from a cache file that is only rebuilt when Data.db changes
+        self.evolution_graph = EvolutionGraph.load(self.repository)
+
+        # Loads the type chart, stats and damaging moves once for the damage calculator
+        self.damage_calculator = DamageCalculator(self.repository)
+
+        # The battle simulator's worker processes are only started by the first simulation, on a job thread
+        self.battle_simulator = None
+        self.battle_simulator_lock = threading.Lock()
+        self.simulation_runner = BatchRunner(self)
+        self.simulation_runner.batch_finished.connect(self.on_simulation_batch_finished)
+        self.simulation_runner.failed.connect(self.on_simulation_failed)
+        self.simulation_runner.finished.connect(self.on_simulation_finished)
+
+        # The team builder's coverage bitsets and worker processes are also created on first use
+        self.team_builder = None
+        self.team_builder_lock = threading.Lock()
+
+        self.type_colors = TYPE_COLORS
+
+        # Precomputes the background style of every type once
+        self.theme = TypeTheme(self.type_colors)
+        self.setStyleSheet(self.theme.stylesheet)
 
         # Creates a QStackedWidget to manage different screens in the application
         self.stacked_widget = QStackedWidget(self)
@@ -61,11 +127,56 @@ class MainWindow(QWidget):
         # Adds the main menu screen to the stacked widget
         self.stacked_widget.addWidget(self.main_menu_widget)
 
-        # Sets the layout for the main window to include the stacked widget
+        # Builds the other screens the first time they are shown and keeps them afterwards. The two search
+        # screens hold the user's searches and results, so they are pinned; if they are ever freed, their
+        # lookups are cancelled first so no result arrives for a deleted widget
+        self.screens = ScreenRegistry(self.stacked_widget)
+        self.screen_types = {}
+        self.screens.register("search", self.setup_search_screen, pinned=True,
+                              on_evict=lambda: (self.tasks.cancel("pokemon"), self.tasks.cancel("image"),
+                                                self.screen_types.pop("search", None)))
+        self.screens.register("move_search", self.setup_move_search_screen, pinned=True,
+                              on_evict=lambda: (self.tasks.cancel("moves"), self.screen_types.pop("move_search", None)))
+        self.screens.register("damage", self.setup_damage_screen)
+        self.screens.register("simulator", self.setup_simulator_screen, on_evict=self.stop_simulation)
+        self.screens.register("team_builder", self.setup_team_builder_screen,
+                              on_evict=lambda: self.jobs.cancel("team"))
+        self.screens.register("diagnostics", self.setup_diagnostics_screen)
+
+        # Sets the layout for the main window to include the stacked widget inside the
+        # background container, which is the only widget restyled when the type changes
+        self.background = self.theme.create_background()
+        background_layout = QVBoxLayout()
+        background_layout.addWidget(self.stacked_widget)
+        self.background.setLayout(background_layout)
+
+        # Thin busy bar under the screens, shown while a query or image load is running
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setTextVisible(False)
+        self.busy_indicator.setFixedHeight(6)
+        self.busy_indicator.hide()
+        background_layout.addWidget(self.busy_indicator)
+
+        # Waits briefly before showing the bar so quick lookups do not make it flicker
+        self.busy_timer = QTimer(self)
+        self.busy_timer.setSingleShot(True)
+        self.busy_timer.setInterval(150)
+        self.busy_timer.timeout.connect(self.busy_indicator.show)
+        self.tasks.busy_changed.connect(self.set_busy)
+
         layout = QVBoxLayout()
-        layout.addWidget(self.stacked_widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.background)
         self.setLayout(layout)
 
+    def set_busy(self, busy):
+        if busy:
+            self.busy_timer.start()
+        else:
+            self.busy_timer.stop()
+            self.busy_indicator.hide()
+
     def setup_main_menu(self):
         layout = QVBoxLayout()
 
@@ -86,21 +197,30 @@ class MainWindow(QWidget):
         move_search_button.clicked.connect(self.show_move_search_screen)
         layout.addWidget(move_search_button)
 
-        # Creates a button that takes you to the screen that searchs for screens that are under development
-        other_button1 = QPushButton("Other Feature 1")
-        other_button1.clicked.connect(lambda: self.show_other_screen(1))
-        layout.addWidget(other_button1)
-
-        # Creates a button that takes you to the screen that searchs for screens that are under development
-        other_button2 = QPushButton("Other Feature 2")
-        other_button2.clicked.connect(lambda: self.show_other_screen(2))
-        layout.addWidget(other_button2)
+        # Creates a button that takes you to the damage calculator
+        damage_button = QPushButton("Damage Calculator")
+        damage_button.clicked.connect(self.show_damage_screen)
+        layout.addWidget(damage_button)
+
+        # Creates a button that takes you to the battle simulator
+        simulator_button = QPushButton("Battle Simulator")
+        simulator_button.clicked.connect(self.show_simulator_screen)
+        layout.addWidget(simulator_button)
+
+        # Creates a button that takes you to the team builder
+        team_builder_button = QPushButton("Team Builder")
+        team_builder_button.clicked.connect(self.show_team_builder_screen)
+        layout.addWidget(team_builder_button)
+
+        # Creates a button that takes you to the timings of recent operations
+        diagnostics_button = QPushButton("Diagnostics")
+        diagnostics_button.clicked.connect(self.show_diagnostics_screen)
+        layout.addWidget(diagnostics_button)
         self.main_menu_widget.setLayout(layout)
 
     def setup_search_screen(self):
         search_widget = QWidget()
         layout = QVBoxLayout()
-        self.reset_button_styles()
 
         # Creates a horizontal layout for the label, search bar, buttons, and combo box
         search_layout = QHBoxLayout()
@@ -110,9 +230,11 @@ class MainWindow(QWidget):
         search_label.setStyleSheet("color: white; margin: 20px;")
 
         self.search_bar = QLineEdit()
-        self.search_bar.setPlaceholderText("Enter Pokémon ID or Name")
-        self.search_bar.setFixedWidth(250)
+        self.search_bar.setPlaceholderText("ID, name, or e.g. type:fire speed>=100 gen:1-3")
+        self.search_bar.setFixedWidth(300)
         self.search_bar.setStyleSheet("background-color: white; color: black;")
+        self.attach_live_search(self.search_bar, self.pokemon_name_index,
+                                lambda text: self.search_pokemon())
 
         # Button to search by ID/Name
         search_button = QPushButton("Search by ID/Name")
@@ -122,10 +244,7 @@ class MainWindow(QWidget):
         # Combo box for selecting Pokémon type
         self.type_combo_box = QComboBox()
         self.type_combo_box.addItem("Select Pokémon Type")
-        pokemon_types = ['Fire', 'Water', 'Grass', 'Electric', 'Ice', 'Fighting', 'Flying',
-                         'Poison', 'Ground', 'Rock', 'Bug', 'Ghost', 'Steel', 'Dragon',
-                         'Dark', 'Fairy', 'Normal', 'Psychic']
-        self.type_combo_box.addItems(pokemon_types)
+        self.type_combo_box.addItems(POKEMON_TYPES)
         self.type_combo_box.setFixedWidth(200)
         self.type_combo_box.setStyleSheet("background-color: white; color: black;")
 
@@ -158,6 +277,25 @@ class MainWindow(QWidget):
         self.right_arrow_button.setFixedWidth(50)
         self.right_arrow_button.clicked.connect(self.show_next_pokemon)
         navigation_layout.addWidget(self.right_arrow_button)
+        navigation_layout.addStretch()
+
+        # The arrow keys do the same anywhere on the screen; the search bar and tables keep them for themselves
+        for key, button in ((Qt.Key_Left, self.left_arrow_button), (Qt.Key_Right, self.right_arrow_button)):
+            shortcut = QShortcut(QKeySequence(key), search_widget)
+            shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(button.click)
+
+        # Combo box and button for ranking every Pokémon by a stat or a weighted preset
+        self.rank_combo_box = QComboBox()
+        self.rank_combo_box.addItems(STAT_NAMES + list(RANKING_PRESETS))
+        self.rank_combo_box.setFixedWidth(200)
+        self.rank_combo_box.setStyleSheet("background-color: white; color: black;")
+        navigation_layout.addWidget(self.rank_combo_box)
+
+        rank_button = QPushButton("Show Top 25")
+        rank_button.setFixedWidth(150)
+        rank_button.clicked.connect(self.rank_pokemon)
+        navigation_layout.addWidget(rank_button)
 
         layout.addLayout(navigation_layout)
 
@@ -165,8 +303,27 @@ class MainWindow(QWidget):
         self.results_display = QTextEdit()
         self.results_display.setReadOnly(True)
         self.results_display.setStyleSheet("background-color: white; color: black;")
+        self.results_display.setMaximumHeight(80)
         layout.addWidget(self.results_display)
 
+        # Stat percentiles and the Pokémon with the most similar stat spread
+        self.stats_display = QLabel()
+        self.stats_display.setWordWrap(True)
+        self.stats_display.setStyleSheet("color: white;")
+        layout.addWidget(self.stats_display)
+
+        # One button per member of the current Pokémon's evolution family, for jumping between stages
+        self.family_layout = QHBoxLayout()
+        self.family_buttons = {}
+        self.shown_family = None
+        layout.addLayout(self.family_layout)
+
+        # Table for type search results; clicking a row shows that Pokémon
+        self.pokemon_results_model = ResultsTableModel(POKEMON_HEADERS)
+        self.pokemon_results_table = self.create_results_table(self.pokemon_results_model,
+                                                               self.show_pokemon_from_results)
+        layout.addWidget(self.pokemon_results_table)
+
         self.pokemon_image_label = QLabel()
         self.pokemon_image_label.setFixedSize(100, 100)
         self.pokemon_image_label.setAlignment(Qt.AlignCenter)
@@ -179,11 +336,61 @@ class MainWindow(QWidget):
         layout.addWidget(back_button)
 
         search_widget.setLayout(layout)
-        self.stacked_widget.addWidget(search_widget)
-        self.stacked_widget.setCurrentWidget(search_widget)
 
         # Initialize current Pokémon ID tracker
         self.current_pokemon_id = 1
+        return search_widget
+
+    def attach_live_search(self, line_edit, name_index, on_selected):
+        # Shows matching names under the search bar as the user types
+        model = QStringListModel(line_edit)
+        completer = QCompleter(model, line_edit)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        # The index already did the matching, so the popup shows its results unfiltered
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        line_edit.setCompleter(completer)
+
+        # Waits for a short pause in typing before looking up suggestions
+        debounce_timer = QTimer(line_edit)
+        debounce_timer.setSingleShot(True)
+        debounce_timer.setInterval(150)
+
+        def update_suggestions():
+            model.setStringList(name_index.search(line_edit.text()))
+            if model.rowCount() and line_edit.hasFocus():
+                completer.complete()
+
+        def on_activated(text):
+            line_edit.setText(text)
+            on_selected(text)
+
+        debounce_timer.timeout.connect(update_suggestions)
+        line_edit.textEdited.connect(debounce_timer.start)
+        completer.activated[str].connect(on_activated)
+
+    def create_results_table(self, model, on_clicked):
+        table = QTableView()
+        table.setModel(model)
+        table.setSortingEnabled(True)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setStyleSheet("background-color: white; color: black;")
+        table.clicked.connect(lambda index: on_clicked(model.row(index.row())))
+        return table
+
+    def show_results(self, table, model, rows):
+        # Rows arrive in query order, so the old sort indicator no longer applies
+        with self.instrumentation.timed("results.render", f"{len(rows)} rows"):
+            table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            model.set_rows(rows)
+            table.scrollToTop()
+
+    def show_pokemon_from_results(self, row):
+        self.show_pokemon(row)
+
+    def show_move_from_results(self, row):
+        self.theme_screen("move_search", row[1])
+        self.move_results_display.setPlainText(format_move(row))
 
     def show_previous_pokemon(self):
         if self.current_pokemon_id > 1:  # Prevent going below ID 1
@@ -193,147 +400,183 @@ class MainWindow(QWidget):
             self.results_display.setPlainText("This is the first Pokémon.")
 
     def show_next_pokemon(self):
-        conn = sqlite3.connect('Data.db')
-        cursor = conn.cursor()
-    
-        # Find the max ID in the database
-        cursor.execute("SELECT MAX(ID) FROM Pokemon")
-        max_id = cursor.fetchone()[0]
-        conn.close()
-
-        if self.current_pokemon_id < max_id:  # Prevent going past the last Pokémon
+        # The max ID is cached by the repository when it opens the database
+        if self.current_pokemon_id < self.repository.max_id:  # Prevent going past the last Pokémon
             self.current_pokemon_id += 1
             self.fetch_pokemon_by_id(self.current_pokemon_id)
         else:
             self.results_display.setPlainText("This is the last Pokémon.")
 
     def fetch_pokemon_by_id(self, pokemon_id):
-        conn = sqlite3.connect('Data.db')
-        cursor = conn.cursor()
+        # Uses the prefetched row when there is one, and drops any lookup still running
+        result = self.prefetcher.get_row(pokemon_id)
+        if result:
+            self.tasks.cancel("pokemon")
+            self.show_pokemon(result)
+            return
 
         # Fetch Pokémon by ID
-        query = "SELECT * FROM Pokemon WHERE ID = ?"
-        cursor.execute(query, (pokemon_id,))
-        result = cursor.fetchone()
-        conn.close()
-
-        if result:
-            display_text = (f"ID: {result[0]}, Name: {result[1]}, Type: {result[2]}, Total: {result[3]}, "
-                            f"HP: {result[4]}, Attack: {result[5]}, Defense: {result[6]}, SpAtk: {result[7]}, "
-                            f"SpDef: {result[8]}, Speed: {result[9]}, Evolution: {result[10]}")
-            self.update_palette_for_type(result[2])
-            self.results_display.setPlainText(display_text)
-            self.load_pokemon_image(pokemon_id)
-        else:
-            self.results_display.setPlainText(f"No Pokémon found with ID {pokemon_id}.")
+        self.tasks.submit("pokemon", self.repository.fetch_pokemon_by_id, pokemon_id,
+                          on_result=lambda result: self.on_pokemon_fetched(
+                              result, f"No Pokémon found with ID {pokemon_id}."))
 
     def fetch_pokemon_by_name(self, pokemon_name):
-        conn = sqlite3.connect('Data.db')
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM Pokemon WHERE UPPER(Name) = UPPER(?)"
-        cursor.execute(query, (pokemon_name,))
-        result = cursor.fetchone()
-        conn.close()
+        self.tasks.submit("pokemon", self.repository.fetch_pokemon_by_name, pokemon_name,
+                          on_result=lambda result: self.on_pokemon_fetched(
+                              result, f"No Pokémon found with name '{pokemon_name}'."))
 
+    def on_pokemon_fetched(self, result, not_found_text):
         if result:
-            display_text = (f"ID: {result[0]}, Name: {result[1]}, Type: {result[2]}, Total: {result[3]}, "
-                            f"HP: {result[4]}, Attack: {result[5]}, Defense: {result[6]}, SpAtk: {result[7]}, "
-                            f"SpDef: {result[8]}, Speed: {result[9]}, Evolution: {result[10]}")
-            self.update_palette_for_type(result[2])
-            self.results_display.setPlainText(display_text)
-
-            # Load the image using the Pokémon ID
-            self.current_pokemon_id = result[0]
-            self.load_pokemon_image(result[0])  # Use ID from the result to load the image
+            self.show_pokemon(result)
         else:
-            self.results_display.setPlainText(f"No Pokémon found with name '{pokemon_name}'.")
+            self.results_display.setPlainText(not_found_text)
+
+    def show_pokemon(self, row):
+        # Shows one Pokémon's details and image, and starts loading its neighbours
+        with self.instrumentation.timed("pokemon.render", row[0]):
+            self.current_pokemon_id = row[0]
+            self.theme_screen("search", row[2])
+            self.results_display.setPlainText(format_pokemon(row))
+            self.show_pokemon_stats(row[0])
+            self.show_family(row[0])
+            self.load_pokemon_image(row[0])  # Use ID from the result to load the image
+            self.prefetcher.prefetch_around(row[0])
+
+    def show_pokemon_stats(self, pokemon_id):
+        # Both lookups are vectorized over the stats matrix and take microseconds
+        percentiles = self.stats_engine.percentiles_of(pokemon_id)
+        similar_ids, distances = self.stats_engine.similar(pokemon_id)
+        self.stats_display.setText(
+            "Percentiles: " + ", ".join(f"{stat} {value:.0f}%" for stat, value in percentiles.items()) +
+            "\nSimilar stat spread: " + ", ".join(self.stats_engine.name_of(similar_id) for similar_id in similar_ids))
+
+    def show_family(self, pokemon_id):
+        # The buttons are only rebuilt when moving to another family; within one, the current stage is marked
+        family_index = self.evolution_graph.family_of.get(pokemon_id)
+        if family_index is None or family_index != self.shown_family:
+            while self.family_layout.count():
+                widget = self.family_layout.takeAt(0).widget()
+                if widget is not None:
+                    widget.deleteLater()
+            self.family_buttons = {}
+
+            family_label = QLabel("Evolution family:")
+            family_label.setStyleSheet("color: white;")
+            self.family_layout.addWidget(family_label)
+            previous_stage = 0
+            for member_id, name, stage in self.evolution_graph.family(pokemon_id):
+                if stage != previous_stage:
+                    arrow = QLabel("→")
+                    arrow.setStyleSheet("color: white;")
+                    self.family_layout.addWidget(arrow)
+                    previous_stage = stage
+                button = QPushButton(name)
+                button.setCheckable(True)
+                button.clicked.connect(lambda checked, member_id=member_id: self.fetch_pokemon_by_id(member_id))
+                self.family_layout.addWidget(button)
+                self.family_buttons[member_id] = button
+            self.family_layout.addStretch()
+            self.shown_family = family_index
+
+        for member_id, button in self.family_buttons.items():
+            button.setChecked(member_id == pokemon_id)
+
+    def rank_pokemon(self):
+        ranking = self.rank_combo_box.currentText()
+        pokemon_ids, scores = self.stats_engine.rank(ranking, top=25)
+
+        # Only the rows for display come from the database, the ranking itself does not
+        self.tasks.submit("pokemon", self.repository.fetch_pokemon_by_ids, pokemon_ids,
+                          on_result=lambda rows: self.on_ranking_fetched(ranking, pokemon_ids, rows))
+
+    def on_ranking_fetched(self, ranking, pokemon_ids, rows):
+        rows_by_id = {row[0]: row for row in rows}
+        self.show_results(self.pokemon_results_table, self.pokemon_results_model,
+                          [rows_by_id[pokemon_id] for pokemon_id in pokemon_ids])
+        self.results_display.setPlainText(f"Top {len(rows)} Pokémon by {ranking}. Click a row to see its details.")
+        self.stats_display.clear()
+        self.pokemon_image_label.clear()
 
     def load_pokemon_image(self, pokemon_id):
-        # Construct the relative file path based on the Pokémon ID
-        current_dir = os.path.dirname(os.path.abspath(__file__))  # Get the directory of the current script
-        image_path = os.path.join(current_dir, 'Images', f'{pokemon_id}.jpg')  # Create the relative path
-
-        # Set the image in the QLabel
-        pixmap = QPixmap(image_path)  # Load the image using QPixmap
-        if not pixmap.isNull():  # Check if the image loaded successfully
-            self.pokemon_image_label.setPixmap(pixmap.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        else:
-            self.pokemon_image_label.clear()  # Clear if the image is not found
-            self.pokemon_image_label.setText("Image not found.")
+        # Gets the already scaled image from the cache, decoding it in the background only on the first view
+        pixmap = self.pixmap_cache.cached(pokemon_id)
+        if pixmap is not None:
+            self.tasks.cancel("image")
+            with self.instrumentation.timed("image.show", pokemon_id):
+                self.pokemon_image_label.setPixmap(pixmap)
+            return
 
-    def reset_button_styles(self):
-        # Resets the style of buttons to default for all buttons in the current window
-        buttons = self.findChildren(QPushButton)
-        for button in buttons:
-            button.setStyleSheet("color: black; background-color: #f0f0f0;")
+        self.pokemon_image_label.clear()
+        self.tasks.submit("image", self.pixmap_cache.store.load, pokemon_id,
+                          on_result=lambda image: self.on_image_loaded(pokemon_id, image))
+
+    def on_image_loaded(self, pokemon_id, image):
+        # Includes turning the decoded QImage into a QPixmap, which has to happen on the GUI thread
+        with self.instrumentation.timed("image.show", pokemon_id):
+            pixmap = self.pixmap_cache.add_image(pokemon_id, image)
+            if pixmap is not None:
+                self.pokemon_image_label.setPixmap(pixmap)
+            else:
+                self.pokemon_image_label.clear()  # Clear if the image is not found
+                self.pokemon_image_label.setText("Image not found.")
+
+    def theme_screen(self, screen, pokemon_type):
+        # Remembers the type a search screen's result is coloured by, so going back to it restores the colour
+        self.screen_types[screen] = pokemon_type
+        self.update_palette_for_type(pokemon_type)
 
     def update_palette_for_type(self, pokemon_type):
-        """Update the color palette based on Pokémon or Move type. Handles dual types as well."""
-        
-        if "/" in pokemon_type:  # Check for dual type
-            types = pokemon_type.split("/")  # Split the dual types
-            type1 = types[0].strip()
-            type2 = types[1].strip()
-            
-            # Get colors for both types
-            color1 = self.type_colors.get(type1, "#2c3e50")  # Default color if type not found
-            color2 = self.type_colors.get(type2, "#2c3e50")
-            
-            # Apply a gradient background using the two colors
-            self.setStyleSheet(f"background: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0 {color1}, stop:1 {color2});")
-        
-        else:
-            # Single type Pokémon, just apply the regular color
-            color = self.type_colors.get(pokemon_type, "#2c3e50")  # Default color if type not found
-            self.setStyleSheet(f"background-color: {color};")
-
-        self.reset_button_styles()
+        """Update the background based on Pokémon or Move type. Handles dual types as well."""
+        with self.instrumentation.timed("theme.apply", pokemon_type):
+            self.theme.apply(self.background, pokemon_type)
 
     def reset_to_default_palette(self):
-        self.setStyleSheet("background-color: #2c3e50;")
-        self.reset_button_styles()
-        
-    def reset_button_styles(self):
-        buttons = self.findChildren(QPushButton)
-        for button in buttons:
-            button.setStyleSheet("color: black; background-color: #f0f0f0;")
-    
-    def search_pokemon(self, query):
-        self.fetch_pokemon_by_name(query)
-        search_query = self.search_bar.text().strip()
-        conn = sqlite3.connect('Data.db')
-        cursor = conn.cursor()
-        
-        # If the search query is a digit, treat it as an ID
-        if search_query.isdigit():
-            pokemon_id = int(search_query)
-            self.fetch_pokemon_by_id(pokemon_id)
-            # Update the current Pokémon ID to the searched one
-            self.current_pokemon_id = pokemon_id
-        else:
-            # Otherwise, treat it as a name and fetch the Pokémon by name
-            self.fetch_pokemon_by_name(search_query)
+        self.update_palette_for_type("")
+
+    def on_task_failed(self, channel, error):
+        # Unexpected errors, such as a locked or damaged database, are shown where the result would have gone
+        message = f"Something went wrong: {error}"
+        if channel == "pokemon":
+            self.tasks.cancel("image")
+            self.results_display.setPlainText(message)
+            self.pokemon_image_label.clear()
+        elif channel == "image":
+            self.pokemon_image_label.clear()
+            self.pokemon_image_label.setText("Image could not be loaded.")
+        elif channel == "moves":
+            self.move_results_display.setPlainText(message)
 
-            # Searches for the pokemon.
-        query = "SELECT * FROM Pokemon WHERE UPPER(ID) = UPPER(?) OR UPPER(Name) = UPPER(?)"
-        cursor.execute(query, (search_query, search_query))
+    def search_pokemon(self):
+        search_query = self.search_bar.text().strip()
 
-        results = cursor.fetchall()
-        conn.close()
+        # Turns the ID, name or criteria into one query, so the search is a single round trip
+        self.tasks.submit("pokemon", self.repository.search_pokemon, search_query,
+                          on_result=self.on_pokemon_search_finished, on_error=self.on_pokemon_search_failed)
 
-        if results:
-            display_text = ""
-            pokemon_type = results[0][2]
-            self.update_palette_for_type(pokemon_type) # Change the background color to reflect the Pokémon type, including dual types
-            for row in results:
-                display_text += f"ID: {row[0]}, Name: {row[1]}, Type: {row[2]}, Total: {row[3]}, HP: {row[4]}, Attack: {row[5]}, Def: {row[6]}, SpAtk: {row[7]}, SpDef: {row[8]}, Speed: {row[9]}, Evolution: {row[10]}\n"
-            self.results_display.setPlainText(display_text)  
-            self.load_pokemon_image(self.current_pokemon_id)    
+    def on_pokemon_search_failed(self, error):
+        # Criteria the planner does not understand are explained to the user
+        if not isinstance(error, ValueError):
+            logger.error("Pokémon search failed", exc_info=error)
+            self.on_task_failed("pokemon", error)
+            return
+        self.tasks.cancel("image")
+        self.results_display.setPlainText(str(error))
+        self.pokemon_image_label.clear()
+
+    def on_pokemon_search_finished(self, results):
+        self.tasks.cancel("image")
+        if len(results) == 1:
+            self.show_pokemon(results[0])
+        elif results:
+            # Several matches go into the table, the first one is shown in the palette
+            self.show_results(self.pokemon_results_table, self.pokemon_results_model, results)
+            self.theme_screen("search", results[0][2])
+            self.results_display.setPlainText(f"Found {len(results)} Pokémon. Click a row to see its details.")
+            self.pokemon_image_label.clear()
         else:
             self.results_display.setPlainText("No Pokémon found.")
             self.pokemon_image_label.clear()
-            
+
     def search_pokemon_by_type(self):
         selected_type = self.type_combo_box.currentText()
 
@@ -342,33 +585,28 @@ class MainWindow(QWidget):
             self.pokemon_image_label.clear()
             return
 
-        conn = sqlite3.connect('Data.db')  # Connects to the data base
-        cursor = conn.cursor()
-
         # Search for Pokémon by type
-        query = "SELECT * FROM Pokemon WHERE Upper(Type) LIKE(?)"
-        cursor.execute(query, (f'%{selected_type}%',))
+        self.tasks.submit("pokemon", self.repository.search_pokemon_by_type, selected_type,
+                          on_result=lambda results: self.on_pokemon_type_search_finished(selected_type, results))
 
-        results = cursor.fetchall()
-        conn.close()
+    def on_pokemon_type_search_finished(self, selected_type, results):
+        self.tasks.cancel("image")
+        self.show_results(self.pokemon_results_table, self.pokemon_results_model, results)
 
         if results:
-            display_text = ""
             pokemon_type = selected_type
-            self.update_palette_for_type(pokemon_type)
-            for row in results:
-                display_text += f"ID: {row[0]}, Name: {row[1]}, Type: {row[2]}, Total: {row[3]}, HP: {row[4]}, Attack: {row[5]}, Def: {row[6]}, SpAtk: {row[7]}, SpDef: {row[8]}, Speed: {row[9]}, Evolution: {row[10]}\n"
-            self.results_display.setPlainText(display_text)
+            self.theme_screen("search", pokemon_type)
+            self.results_display.setPlainText(f"Found {len(results)} {selected_type} Pokémon. "
+                                              f"Click a row to see its details.")
             self.pokemon_image_label.clear()
         else:
             self.pokemon_image_label.clear()
             self.results_display.setPlainText("No Pokémon found of the selected type.")
-            self.update_palette_for_type("")  # Reset to default color if nothing is found
+            self.theme_screen("search", "")  # Reset to default color if nothing is found
 
     def setup_move_search_screen(self):
         move_search_widget = QWidget()
         layout = QVBoxLayout()
-        self.reset_button_styles()
 
         # Creates a horizontal layout for the search bar, buttons, and combo box
         search_layout = QHBoxLayout()
@@ -381,6 +619,8 @@ class MainWindow(QWidget):
         self.move_search_bar.setPlaceholderText("Enter Move Name")
         self.move_search_bar.setFixedWidth(250)
         self.move_search_bar.setStyleSheet("background-color: white; color: black;")
+        self.attach_live_search(self.move_search_bar, self.move_name_index,
+                                lambda text: self.search_moves_by_name())
 
         # Button to search by move name
         search_button = QPushButton("Search by Name")
@@ -390,10 +630,7 @@ class MainWindow(QWidget):
         # Combo box for selecting move type
         self.move_type_combo_box = QComboBox()
         self.move_type_combo_box.addItem("Select Move Type")
-        move_types = ['Fire', 'Water', 'Grass', 'Electric', 'Ice', 'Fighting', 'Flying',
-                      'Poison', 'Ground', 'Rock', 'Bug', 'Ghost', 'Steel', 'Dragon',
-                      'Dark', 'Fairy', 'Normal', 'Psychic']
-        self.move_type_combo_box.addItems(move_types)
+        self.move_type_combo_box.addItems(POKEMON_TYPES)
         self.move_type_combo_box.setFixedWidth(200)
         self.move_type_combo_box.setStyleSheet("background-color: white; color: black;")
 
@@ -412,12 +649,51 @@ class MainWindow(QWidget):
 
         layout.addLayout(search_layout)  # Add the horizontal search layout
 
+        # Creates a horizontal layout for the numeric move filters
+        filter_layout = QHBoxLayout()
+
+        # Spin boxes for the Power and Accuracy ranges; the lowest value means "Any"
+        self.min_power_spin_box = self.create_filter_spin_box(250)
+        self.max_power_spin_box = self.create_filter_spin_box(250)
+        self.min_accuracy_spin_box = self.create_filter_spin_box(100)
+        self.max_accuracy_spin_box = self.create_filter_spin_box(100)
+
+        # Combo box for choosing the column the filtered moves are sorted by
+        self.move_sort_combo_box = QComboBox()
+        self.move_sort_combo_box.addItems(list(MOVE_SORT_COLUMNS))
+        self.move_sort_combo_box.setFixedWidth(120)
+        self.move_sort_combo_box.setStyleSheet("background-color: white; color: black;")
+
+        # Button to filter moves by the selected ranges
+        filter_button = QPushButton("Filter Moves")
+        filter_button.setFixedWidth(150)
+        filter_button.clicked.connect(self.filter_moves)
+
+        for text, widget in (("Power from", self.min_power_spin_box), ("to", self.max_power_spin_box),
+                             ("Accuracy from", self.min_accuracy_spin_box), ("to", self.max_accuracy_spin_box),
+                             ("Sort by", self.move_sort_combo_box)):
+            filter_label = QLabel(text)
+            filter_label.setStyleSheet("color: white;")
+            filter_layout.addWidget(filter_label)
+            filter_layout.addWidget(widget)
+        filter_layout.addWidget(filter_button)
+        filter_layout.addStretch()
+
+        layout.addLayout(filter_layout)
+
         # Display area for move search results
         self.move_results_display = QTextEdit()
         self.move_results_display.setReadOnly(True)
         self.move_results_display.setStyleSheet("background-color: white; color: black;")
+        self.move_results_display.setMaximumHeight(80)
         layout.addWidget(self.move_results_display)
 
+        # Table for type and filter results; clicking a row shows that move's details
+        self.move_results_model = ResultsTableModel(MOVE_HEADERS)
+        self.move_results_table = self.create_results_table(self.move_results_model,
+                                                            self.show_move_from_results)
+        layout.addWidget(self.move_results_table)
+
         layout.addStretch()
 
         back_button = QPushButton("Back to Main Menu")
@@ -425,8 +701,43 @@ class MainWindow(QWidget):
         layout.addWidget(back_button)
 
         move_search_widget.setLayout(layout)
-        self.stacked_widget.addWidget(move_search_widget)
-        self.stacked_widget.setCurrentWidget(move_search_widget)
+        return move_search_widget
+
+    def create_filter_spin_box(self, maximum):
+        spin_box = QSpinBox()
+        spin_box.setRange(-1, maximum)
+        spin_box.setValue(-1)
+        spin_box.setSpecialValueText("Any")
+        spin_box.setFixedWidth(70)
+        spin_box.setStyleSheet("background-color: white; color: black;")
+        return spin_box
+
+    def filter_moves(self):
+        # Spin boxes left on "Any" do not restrict the search
+        def bound(spin_box):
+            return None if spin_box.value() == spin_box.minimum() else spin_box.value()
+
+        selected_type = self.move_type_combo_box.currentText()
+        sort_by = self.move_sort_combo_box.currentText()
+        criteria = dict(
+            move_type=None if selected_type == "Select Move Type" else selected_type,
+            min_power=bound(self.min_power_spin_box),
+            max_power=bound(self.max_power_spin_box),
+            min_accuracy=bound(self.min_accuracy_spin_box),
+            max_accuracy=bound(self.max_accuracy_spin_box),
+            sort_by=sort_by,
+            descending=sort_by != "Name",
+        )
+        self.tasks.submit("moves", lambda: self.repository.filter_moves(**criteria),
+                          on_result=self.on_move_filter_finished)
+
+    def on_move_filter_finished(self, results):
+        self.show_results(self.move_results_table, self.move_results_model, results)
+
+        if results:
+            self.move_results_display.setPlainText(f"Found {len(results)} moves. Click a row to see its details.")
+        else:
+            self.move_results_display.setPlainText("No moves match the selected filters.")
 
     def search_moves_by_name(self):
         search_query = self.move_search_bar.text().strip()
@@ -434,27 +745,21 @@ class MainWindow(QWidget):
             self.move_results_display.setPlainText("Please enter a move name.")
             return
 
-        conn = sqlite3.connect('Data.db')  # Connects to the data base
-        cursor = conn.cursor()
-
         # Searches for Moves
-        query = "SELECT * FROM Moves WHERE UPPER(Name) = UPPER(?)"
-        cursor.execute(query, (search_query,))
-
-        results = cursor.fetchall()
-        conn.close()
+        self.tasks.submit("moves", self.repository.fetch_moves_by_name, search_query,
+                          on_result=self.on_move_name_search_finished)
 
+    def on_move_name_search_finished(self, results):
         if results:
             display_text = ""
             Move_type = results[0][1]
-            self.update_palette_for_type(Move_type) # Change the background color to reflect the Pokémon type, including dual types
+            self.theme_screen("move_search", Move_type) # Change the background color to reflect the Pokémon type, including dual types
             for row in results:
-                display_text += (f"Name: {row[0]}, Type: {row[1]}, Category: {row[2]}, "
-                                f"Power: {row[3]}, Accuracy: {row[4]}, PP: {row[5]}\n")
+                display_text += format_move(row)
             self.move_results_display.setPlainText(display_text)
         else:
             self.move_results_display.setPlainText("No move found.")
-            self.update_palette_for_type("")  # Reset to default color if nothing is found
+            self.theme_screen("move_search", "")  # Reset to default color if nothing is found
 
     def search_moves_by_type(self):
         selected_type = self.move_type_combo_box.currentText()
@@ -463,57 +768,481 @@ class MainWindow(QWidget):
             self.move_results_display.setPlainText("Please select a valid move type.")
             return
 
-        conn = sqlite3.connect('Data.db') 
-        cursor = conn.cursor()
-
         # Search for moves by type
-        query = "SELECT * FROM Moves WHERE Upper(Type) LIKE(?)"
-        cursor.execute(query, (f'%{selected_type}%',))
+        self.tasks.submit("moves", self.repository.search_moves_by_type, selected_type,
+                          on_result=lambda results: self.on_move_type_search_finished(selected_type, results))
 
-        results = cursor.fetchall()
-        conn.close()
+    def on_move_type_search_finished(self, selected_type, results):
+        self.show_results(self.move_results_table, self.move_results_model, results)
 
         if results:
-            display_text = ""
             Move_type = selected_type
-            self.update_palette_for_type(Move_type)
-            for row in results:
-                display_text += f"Name: {row[0]}, Type: {row[1]}, Category: {row[2]}, Power: {row[3]}, Accuracy: {row[4]}, PP: {row[5]}\n"
-            self.move_results_display.setPlainText(display_text)
+            self.theme_screen("move_search", Move_type)
+            self.move_results_display.setPlainText(f"Found {len(results)} {selected_type} moves. "
+                                                   f"Click a row to see its details.")
         else:
             self.move_results_display.setPlainText("No moves found of the selected type.")
-            self.update_palette_for_type("")  # Reset to default color if nothing is found
+            self.theme_screen("move_search", "")  # Reset to default color if nothing is found
 
     def show_move_search_screen(self):
-        self.setup_move_search_screen()
-        self.reset_to_default_palette()
+        # The screen keeps its last result, so it also gets back the colour of that result
+        self.screens.show("move_search")
+        self.update_palette_for_type(self.screen_types.get("move_search", ""))
 
     def show_search_screen(self):
-        self.setup_search_screen()
-        self.reset_to_default_palette()
+        self.screens.show("search")
+        self.update_palette_for_type(self.screen_types.get("search", ""))
         
     def show_main_menu(self):
         self.reset_to_default_palette()
         self.stacked_widget.setCurrentWidget(self.main_menu_widget)
 
-    def show_other_screen(self, feature_number):
-        feature_widget = QWidget()
+    def show_damage_screen(self):
+        self.screens.show("damage")
+
+    def show_simulator_screen(self):
+        self.screens.show("simulator")
+
+    def show_team_builder_screen(self):
+        self.screens.show("team_builder")
+
+    def show_diagnostics_screen(self):
+        self.screens.show("diagnostics")
+        self.refresh_diagnostics()
+
+    def setup_damage_screen(self):
+        damage_widget = QWidget()
         layout = QVBoxLayout()
 
-        label = QLabel(f"Feature {feature_number} is under construction.")
-        label.setFont(QFont('Arial', 24))
-        label.setStyleSheet("color: white; margin: 20px;")
-        layout.addWidget(label)
-        layout.addStretch()
+        title = QLabel("Damage Calculator")
+        title.setFont(QFont('Arial', 18))
+        title.setStyleSheet("color: white; margin: 20px;")
+        layout.addWidget(title)
+
+        # Combo boxes for the attacker, the defender and the move used against every Pokémon
+        selection_layout = QHBoxLayout()
+        calculator = self.damage_calculator
+        pokemon = list(zip(calculator.names, calculator.ids.tolist()))
+        self.attacker_combo_box = self.create_damage_combo_box(pokemon)
+        self.defender_combo_box = self.create_damage_combo_box(pokemon)
+        self.damage_move_combo_box = self.create_damage_combo_box((name, name) for name in calculator.move_names)
+        for text, widget in (("Attacker", self.attacker_combo_box), ("Defender", self.defender_combo_box),
+                             ("Move", self.damage_move_combo_box)):
+            selection_label = QLabel(text)
+            selection_label.setStyleSheet("color: white;")
+            selection_layout.addWidget(selection_label)
+            selection_layout.addWidget(widget)
+        selection_layout.addStretch()
+        layout.addLayout(selection_layout)
+
+        # Every damaging move used by the attacker on the defender; clicking one picks it as the move
+        self.attacker_moves_label = QLabel()
+        self.attacker_moves_label.setStyleSheet("color: white;")
+        layout.addWidget(self.attacker_moves_label)
+        self.attacker_moves_model = ResultsTableModel(DAMAGE_HEADERS)
+        self.attacker_moves_table = self.create_results_table(
+            self.attacker_moves_model,
+            lambda row: self.damage_move_combo_box.setCurrentIndex(self.damage_move_combo_box.findData(row[0])))
+        layout.addWidget(self.attacker_moves_table)
+
+        # The chosen move used on every Pokémon; clicking one picks it as the defender
+        self.move_targets_label = QLabel()
+        self.move_targets_label.setStyleSheet("color: white;")
+        layout.addWidget(self.move_targets_label)
+        self.move_targets_model = ResultsTableModel(TARGET_HEADERS)
+        self.move_targets_table = self.create_results_table(
+            self.move_targets_model,
+            lambda row: self.defender_combo_box.setCurrentIndex(self.defender_combo_box.findData(row[0])))
+        layout.addWidget(self.move_targets_table)
 
         back_button = QPushButton("Back to Main Menu")
         back_button.clicked.connect(self.show_main_menu)
         layout.addWidget(back_button)
+
+        # Starts with Bulbasaur against Charmander, and recalculates whenever a selection changes
+        self.defender_combo_box.setCurrentIndex(self.defender_combo_box.findData(4))
+        self.damage_move_combo_box.setCurrentIndex(0)
+        self.attacker_combo_box.currentIndexChanged.connect(self.update_attacker_moves)
+        self.attacker_combo_box.currentIndexChanged.connect(self.update_move_targets)
+        self.defender_combo_box.currentIndexChanged.connect(self.update_attacker_moves)
+        self.damage_move_combo_box.currentIndexChanged.connect(self.update_move_targets)
+        self.update_attacker_moves()
+        self.update_move_targets()
+
+        damage_widget.setLayout(layout)
+        return damage_widget
+
+    def create_damage_combo_box(self, items):
+        # Searchable combo box of (text, data) items that only accepts existing entries
+        combo_box = QComboBox()
+        combo_box.setEditable(True)
+        combo_box.setInsertPolicy(QComboBox.NoInsert)
+        for text, data in items:
+            combo_box.addItem(text, data)
+        combo_box.completer().setFilterMode(Qt.MatchContains)
+        combo_box.completer().setCompletionMode(QCompleter.PopupCompletion)
+        combo_box.setFixedWidth(220)
+        combo_box.setStyleSheet("background-color: white; color: black;")
+        return combo_box
+
+    def update_attacker_moves(self):
+        # Both tables are single vectorized passes, fast enough to run on the GUI thread per change
+        attacker_id, defender_id = self.attacker_combo_box.currentData(), self.defender_combo_box.currentData()
+        if attacker_id is None or defender_id is None:
+            return
+        self.show_results(self.attacker_moves_table, self.attacker_moves_model,
+                          self.damage_calculator.moves_against(attacker_id, defender_id))
+        self.attacker_moves_label.setText(f"Moves used by {self.attacker_combo_box.currentText()} "
+                                          f"on {self.defender_combo_box.currentText()}, strongest first:")
+
+    def update_move_targets(self):
+        attacker_id, move_name = self.attacker_combo_box.currentData(), self.damage_move_combo_box.currentData()
+        if attacker_id is None or move_name is None:
+            return
+        self.show_results(self.move_targets_table, self.move_targets_model,
+                          self.damage_calculator.move_against_all(attacker_id, move_name))
+        self.move_targets_label.setText(f"{move_name} used by {self.attacker_combo_box.currentText()} "
+                                        f"on every Pokémon, by share of HP lost:")
+
+    def setup_simulator_screen(self):
+        simulator_widget = QWidget()
+        layout = QVBoxLayout()
+
+        title = QLabel("Battle Simulator")
+        title.setFont(QFont('Arial', 18))
+        title.setStyleSheet("color: white; margin: 20px;")
+        layout.addWidget(title)
+
+        # Teams are comma-separated names or IDs; an empty second team means random opponents
+        self.team_a_bar = QLineEdit("Charizard")
+        self.team_b_bar = QLineEdit("Blastoise")
+        self.team_b_bar.setPlaceholderText("Leave empty for random opponents")
+        for text, widget in (("Team A", self.team_a_bar), ("Team B", self.team_b_bar)):
+            team_layout = QHBoxLayout()
+            team_label = QLabel(text)
+            team_label.setFixedWidth(80)
+            team_label.setStyleSheet("color: white;")
+            widget.setStyleSheet("background-color: white; color: black;")
+            team_layout.addWidget(team_label)
+            team_layout.addWidget(widget)
+            layout.addLayout(team_layout)
+
+        # Number of battles and the seed that makes a run reproducible
+        run_layout = QHBoxLayout()
+        self.battle_count_spin_box = QSpinBox()
+        self.battle_count_spin_box.setRange(BATCH_SIZE, 1000000)
+        self.battle_count_spin_box.setSingleStep(BATCH_SIZE)
+        self.battle_count_spin_box.setValue(10000)
+        self.seed_spin_box = QSpinBox()
+        self.seed_spin_box.setRange(0, 999999)
+        for text, widget in (("Battles", self.battle_count_spin_box), ("Seed", self.seed_spin_box)):
+            run_label = QLabel(text)
+            run_label.setStyleSheet("color: white;")
+            widget.setFixedWidth(120)
+            widget.setStyleSheet("background-color: white; color: black;")
+            run_layout.addWidget(run_label)
+            run_layout.addWidget(widget)
+
+        self.simulate_button = QPushButton("Simulate")
+        self.simulate_button.setFixedWidth(150)
+        self.simulate_button.clicked.connect(self.run_simulation)
+        run_layout.addWidget(self.simulate_button)
+
+        stop_button = QPushButton("Stop")
+        stop_button.setFixedWidth(150)
+        stop_button.clicked.connect(self.stop_simulation)
+        run_layout.addWidget(stop_button)
+        run_layout.addStretch()
+        layout.addLayout(run_layout)
+
+        self.simulation_progress = QProgressBar()
+        layout.addWidget(self.simulation_progress)
+
+        self.simulation_results = QLabel()
+        self.simulation_results.setFont(QFont('Arial', 14))
+        self.simulation_results.setStyleSheet("color: white;")
+        layout.addWidget(self.simulation_results)
         layout.addStretch()
 
-        feature_widget.setLayout(layout)
-        self.stacked_widget.addWidget(feature_widget)
-        self.stacked_widget.setCurrentWidget(feature_widget)
+        back_button = QPushButton("Back to Main Menu")
+        back_button.clicked.connect(self.show_main_menu)
+        layout.addWidget(back_button)
+
+        simulator_widget.setLayout(layout)
+        return simulator_widget
+
+    def run_simulation(self):
+        team_a = self.team_a_bar.text().split(',')
+        team_b = self.team_b_bar.text().split(',') if self.team_b_bar.text().strip() else []
+        battles = self.battle_count_spin_box.value()
+
+        # The first run builds the battle data and spawns the worker processes, which takes most of a
+        # second, so the simulator is started from a job thread like every other long call
+        self.simulation_progress.setRange(0, battles)
+        self.simulation_progress.setValue(0)
+        self.simulation_results.setText("Starting the simulator..." if self.battle_simulator is None
+                                        else "Simulating...")
+        self.simulate_button.setEnabled(False)
+        self.jobs.submit("simulation", self.start_simulation, team_a, team_b, battles, self.seed_spin_box.value(),
+                         on_result=self.on_simulation_started, on_error=self.on_simulation_failed,
+                         on_discard=self.cancel_batches)
+
+    def start_simulation(self, team_a, team_b, battles, seed):
+        # Runs on a job thread and returns one future per batch; the lock keeps overlapping starts to one pool
+        with self.battle_simulator_lock:
+            if self.battle_simulator is None:
+                self.battle_simulator = BattleSimulator(BattleData(self.repository))
+        data = self.battle_simulator.data
+        team_a = data.resolve_team(team_a)
+        team_b = data.resolve_team(team_b) if team_b else []
+        return self.battle_simulator.submit(team_a, team_b, battles, seed=seed)
+
+    def on_simulation_started(self, futures):
+        # Battles run in batches on the process pool, and the totals are updated as each batch arrives
+        self.simulation_totals = [0, 0, 0, 0]
+        self.simulation_started = time.perf_counter()
+        self.simulation_results.setText("Simulating...")
+        self.simulation_runner.start(futures)
+
+    def cancel_batches(self, futures):
+        # A run stopped or replaced while it was starting still queued its batches, which would delay the next run
+        for future in futures:
+            future.cancel()
+
+    def stop_simulation(self):
+        self.jobs.cancel("simulation")
+        self.simulation_runner.cancel()
+        self.on_simulation_finished()
+
+    def on_simulation_batch_finished(self, result):
+        for position, value in enumerate(result):
+            self.simulation_totals[position] += value
+        wins_a, wins_b, draws, turns = self.simulation_totals
+        battles = wins_a + wins_b + draws
+        elapsed = time.perf_counter() - self.simulation_started
+
+        self.simulation_progress.setValue(battles)
+        self.simulation_results.setText(
+            f"Team A wins: {wins_a / battles:.1%}\nTeam B wins: {wins_b / battles:.1%}\n"
+            f"Draws: {draws / battles:.1%}\n\n{battles} battles, {turns / battles:.1f} turns on average, "
+            f"{turns / elapsed:,.0f} turns per second")
+
+    def on_simulation_failed(self, error):
+        # Unknown Pokémon and team sizes come back as a ValueError with a message for the user
+        self.simulation_results.setText(str(error) if isinstance(error, ValueError) else f"Simulation failed: {error}")
+        self.simulate_button.setEnabled(True)
+
+    def on_simulation_finished(self):
+        self.simulate_button.setEnabled(True)
+
+    def setup_team_builder_screen(self):
+        team_builder_widget = QWidget()
+        layout = QVBoxLayout()
+
+        title = QLabel("Team Builder")
+        title.setFont(QFont('Arial', 18))
+        title.setStyleSheet("color: white; margin: 20px;")
+        layout.addWidget(title)
+
+        # Constraints: Pokémon that must be on the team, types to leave out and a minimum Speed
+        self.required_members_bar = QLineEdit()
+        self.required_members_bar.setPlaceholderText("Names or IDs that must be on the team, comma-separated")
+        self.banned_types_bar = QLineEdit()
+        self.banned_types_bar.setPlaceholderText("Types to leave out, comma-separated")
+        for text, widget in (("Include", self.required_members_bar), ("Ban types", self.banned_types_bar)):
+            constraint_layout = QHBoxLayout()
+            constraint_label = QLabel(text)
+            constraint_label.setFixedWidth(100)
+            constraint_label.setStyleSheet("color: white;")
+            widget.setStyleSheet("background-color: white; color: black;")
+            constraint_layout.addWidget(constraint_label)
+            constraint_layout.addWidget(widget)
+            layout.addLayout(constraint_layout)
+
+        search_layout = QHBoxLayout()
+        self.min_speed_spin_box = QSpinBox()
+        self.min_speed_spin_box.setRange(0, 200)
+        self.team_count_spin_box = QSpinBox()
+        self.team_count_spin_box.setRange(1, 100)
+        self.team_count_spin_box.setValue(10)
+        for text, widget in (("Minimum Speed", self.min_speed_spin_box), ("Teams", self.team_count_spin_box)):
+            search_label = QLabel(text)
+            search_label.setStyleSheet("color: white;")
+            widget.setFixedWidth(120)
+            widget.setStyleSheet("background-color: white; color: black;")
+            search_layout.addWidget(search_label)
+            search_layout.addWidget(widget)
+
+        self.build_team_button = QPushButton("Find Teams")
+        self.build_team_button.setFixedWidth(150)
+        self.build_team_button.clicked.connect(self.build_teams)
+        search_layout.addWidget(self.build_team_button)
+        search_layout.addStretch()
+        layout.addLayout(search_layout)
+
+        # Connected to the bar itself, so Qt drops the connection if the screen is evicted mid-search
+        self.team_search_progress_bar = QProgressBar()
+        self.team_search_progress.connect(self.team_search_progress_bar.setValue)
+        layout.addWidget(self.team_search_progress_bar)
+
+        self.team_search_status = QLabel()
+        self.team_search_status.setStyleSheet("color: white;")
+        layout.addWidget(self.team_search_status)
+
+        # Clicking a team sends it to the battle simulator as Team A
+        self.team_results_model = ResultsTableModel(TEAM_HEADERS)
+        self.team_results_table = self.create_results_table(self.team_results_model, self.simulate_team)
+        self.team_results_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.team_results_table)
+
+        back_button = QPushButton("Back to Main Menu")
+        back_button.clicked.connect(self.show_main_menu)
+        layout.addWidget(back_button)
+
+        team_builder_widget.setLayout(layout)
+        return team_builder_widget
+
+    def build_teams(self):
+        required = [key for key in self.required_members_bar.text().split(',') if key.strip()]
+        banned_types = [key.strip().capitalize() for key in self.banned_types_bar.text().split(',') if key.strip()]
+
+        # The search runs on a job thread, which hands the beam search steps to the worker processes
+        self.team_search_started = time.perf_counter()
+        self.team_search_progress_bar.setValue(0)
+        self.team_search_status.setText("Searching...")
+        self.build_team_button.setEnabled(False)
+        self.jobs.submit("team", self.find_teams, self.team_count_spin_box.value(), banned_types,
+                         self.min_speed_spin_box.value(), required,
+                         lambda done, total: self.team_search_progress.emit(done * 100 // total),
+                         on_result=self.on_teams_found,
+                         on_error=self.on_team_search_failed)
+
+    def find_teams(self, *args):
+        # Runs on a job thread, which also builds the team data the first time
+        with self.team_builder_lock:
+            if self.team_builder is None:
+                self.team_builder = TeamBuilder(TeamData(self.repository))
+        return self.team_builder.search(*args)
+
+    def on_teams_found(self, rows):
+        self.build_team_button.setEnabled(True)
+        self.show_results(self.team_results_table, self.team_results_model, rows)
+        elapsed = time.perf_counter() - self.team_search_started
+        self.team_search_status.setText(f"Found {len(rows)} teams in {elapsed:.1f} s. "
+                                        f"Click a team to simulate its battles.")
+
+    def on_team_search_failed(self, error):
+        self.build_team_button.setEnabled(True)
+        self.team_search_status.setText(str(error))
+
+    def simulate_team(self, row):
+        self.show_simulator_screen()
+        self.team_a_bar.setText(row[1])
+
+    def setup_diagnostics_screen(self):
+        diagnostics_widget = QWidget()
+        layout = QVBoxLayout()
+
+        title = QLabel("Diagnostics")
+        title.setFont(QFont('Arial', 18))
+        title.setStyleSheet("color: white; margin: 20px;")
+        layout.addWidget(title)
+
+        self.diagnostics_summary = QLabel()
+        self.diagnostics_summary.setStyleSheet("color: white;")
+        layout.addWidget(self.diagnostics_summary)
+
+        # One row per timed operation; clicking one shows its latency histogram
+        self.diagnostics_model = ResultsTableModel(DIAGNOSTICS_HEADERS)
+        self.diagnostics_table = self.create_results_table(self.diagnostics_model, self.show_histogram)
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.diagnostics_table)
+
+        self.histogram_display = QTextEdit()
+        self.histogram_display.setReadOnly(True)
+        self.histogram_display.setFont(QFont('Monospace', 9))
+        self.histogram_display.setStyleSheet("background-color: white; color: black;")
+        layout.addWidget(self.histogram_display)
+
+        slow_label = QLabel(f"Operations slower than {self.instrumentation.slow_ms} ms, most recent first:")
+        slow_label.setStyleSheet("color: white;")
+        layout.addWidget(slow_label)
+        self.slow_operations_display = QTextEdit()
+        self.slow_operations_display.setReadOnly(True)
+        self.slow_operations_display.setStyleSheet("background-color: white; color: black;")
+        layout.addWidget(self.slow_operations_display)
+
+        button_layout = QHBoxLayout()
+        for text, slot in (("Refresh", self.refresh_diagnostics), ("Save JSON", self.save_diagnostics),
+                           ("Reset", self.reset_diagnostics)):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        back_button = QPushButton("Back to Main Menu")
+        back_button.clicked.connect(self.show_main_menu)
+        layout.addWidget(back_button)
+
+        diagnostics_widget.setLayout(layout)
+        return diagnostics_widget
+
+    def refresh_diagnostics(self):
+        snapshot = self.instrumentation.snapshot()
+        self.diagnostics_snapshot = snapshot
+        if snapshot["memory_kb"] is None:
+            memory = "Memory: unknown"
+        else:
+            label = "Peak memory" if snapshot["memory_kind"] == "peak" else "Memory"
+            memory = f"{label}: {snapshot['memory_kb'] / 1024:.1f} MB"
+        self.diagnostics_summary.setText(f"{memory}   "
+                                         f"Queries: {self.repository.query_count}   "
+                                         f"Up for {snapshot['uptime_s']:.0f} s")
+        self.show_results(self.diagnostics_table, self.diagnostics_model, self.instrumentation.rows(snapshot))
+        self.histogram_display.clear()
+        self.slow_operations_display.setPlainText("\n".join(
+            f"{time.strftime('%H:%M:%S', time.localtime(entry['time']))}  {entry['operation']}  "
+            f"{entry['elapsed_ms']:.1f} ms  {entry['detail'] or ''}"
+            for entry in reversed(snapshot["slow_operations"])))
+
+    def show_histogram(self, row):
+        # Draws the counts of the snapshot on display as text bars, one per bucket
+        histogram = self.diagnostics_snapshot["operations"][row[0]]
+        counts = list(histogram["buckets"].values())
+        widest = max(counts) or 1
+        lines = [f"{row[0]}: {histogram['count']} calls"]
+        for label, count in zip(histogram["buckets"], counts):
+            lines.append(f"{label:>8} ms {count:>7}  {'#' * round(40 * count / widest)}")
+        self.histogram_display.setPlainText("\n".join(lines))
+
+    def save_diagnostics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Diagnostics", "diagnostics.json", "JSON (*.json)")
+        if path:
+            try:
+                self.instrumentation.dump(path)
+            except OSError as e:
+                self.diagnostics_summary.setText(f"Could not save {path}: {e.strerror}")
+
+    def reset_diagnostics(self):
+        self.instrumentation.reset()
+        self.refresh_diagnostics()
+
+    def closeEvent(self, event):
+        # Waits for background loads to finish before the database is closed
+        if self.team_builder is not None:
+            self.team_builder.shutdown()
+        self.jobs.shutdown()
+        self.tasks.shutdown()
+        self.simulation_runner.cancel()
+
+        # Also covers a team builder or simulator that a job was still creating when the window closed
+        for engine in (self.team_builder, self.battle_simulator):
+            if engine is not None:
+                engine.shutdown()
+        self.prefetcher.shutdown()
+        self.screens.clear()
+        self.repository.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication([])
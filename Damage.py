@@ -0,0 +1,146 @@
+import numpy as np
+
+from Pokedex import POKEMON_TYPES
+from Stats import RowIndex
+
+
+# Multipliers that differ from 1x, by attacking type, from the current generation's type chart
+TYPE_CHART = {
+    'Normal': {'Rock': 0.5, 'Ghost': 0.0, 'Steel': 0.5},
+    'Fire': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2.0, 'Ice': 2.0, 'Bug': 2.0, 'Rock': 0.5, 'Dragon': 0.5,
+             'Steel': 2.0},
+    'Water': {'Fire': 2.0, 'Water': 0.5, 'Grass': 0.5, 'Ground': 2.0, 'Rock': 2.0, 'Dragon': 0.5},
+    'Electric': {'Water': 2.0, 'Electric': 0.5, 'Grass': 0.5, 'Ground': 0.0, 'Flying': 2.0, 'Dragon': 0.5},
+    'Grass': {'Fire': 0.5, 'Water': 2.0, 'Grass': 0.5, 'Poison': 0.5, 'Ground': 2.0, 'Flying': 0.5, 'Bug': 0.5,
+              'Rock': 2.0, 'Dragon': 0.5, 'Steel': 0.5},
+    'Ice': {'Fire': 0.5, 'Water': 0.5, 'Grass': 2.0, 'Ice': 0.5, 'Ground': 2.0, 'Flying': 2.0, 'Dragon': 2.0,
+            'Steel': 0.5},
+    'Fighting': {'Normal': 2.0, 'Ice': 2.0, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 0.5, 'Bug': 0.5, 'Rock': 2.0,
+                 'Ghost': 0.0, 'Dark': 2.0, 'Steel': 2.0, 'Fairy': 0.5},
+    'Poison': {'Grass': 2.0, 'Poison': 0.5, 'Ground': 0.5, 'Rock': 0.5, 'Ghost': 0.5, 'Steel': 0.0, 'Fairy': 2.0},
+    'Ground': {'Fire': 2.0, 'Electric': 2.0, 'Grass': 0.5, 'Poison': 2.0, 'Flying': 0.0, 'Bug': 0.5, 'Rock': 2.0,
+               'Steel': 2.0},
+    'Flying': {'Electric': 0.5, 'Grass': 2.0, 'Fighting': 2.0, 'Bug': 2.0, 'Rock': 0.5, 'Steel': 0.5},
+    'Psychic': {'Fighting': 2.0, 'Poison': 2.0, 'Psychic': 0.5, 'Dark': 0.0, 'Steel': 0.5},
+    'Bug': {'Fire': 0.5, 'Grass': 2.0, 'Fighting': 0.5, 'Poison': 0.5, 'Flying': 0.5, 'Psychic': 2.0, 'Ghost': 0.5,
+            'Dark': 2.0, 'Steel': 0.5, 'Fairy': 0.5},
+    'Rock': {'Fire': 2.0, 'Ice': 2.0, 'Fighting': 0.5, 'Ground': 0.5, 'Flying': 2.0, 'Bug': 2.0, 'Steel': 0.5},
+    'Ghost': {'Normal': 0.0, 'Psychic': 2.0, 'Ghost': 2.0, 'Dark': 0.5},
+    'Dragon': {'Dragon': 2.0, 'Steel': 0.5, 'Fairy': 0.0},
+    'Dark': {'Fighting': 0.5, 'Psychic': 2.0, 'Ghost': 2.0, 'Dark': 0.5, 'Fairy': 0.5},
+    'Steel': {'Fire': 0.5, 'Water': 0.5, 'Electric': 0.5, 'Ice': 2.0, 'Rock': 2.0, 'Steel': 0.5, 'Fairy': 2.0},
+    'Fairy': {'Fire': 0.5, 'Fighting': 2.0, 'Poison': 0.5, 'Dragon': 2.0, 'Dark': 2.0, 'Steel': 0.5},
+}
+
+# Index of each type in the matrices; the extra index NO_TYPE stands for a missing second type
+TYPE_INDEX = {type_name: index for index, type_name in enumerate(POKEMON_TYPES)}
+NO_TYPE = len(POKEMON_TYPES)
+
+# EFFECTIVENESS[attacking, defending] for single types
+EFFECTIVENESS = np.ones((len(POKEMON_TYPES), len(POKEMON_TYPES)))
+for attacking, multipliers in TYPE_CHART.items():
+    for defending, multiplier in multipliers.items():
+        EFFECTIVENESS[TYPE_INDEX[attacking], TYPE_INDEX[defending]] = multiplier
+
+# DUAL_EFFECTIVENESS[attacking, first, second] for every type pair, so a dual type is one lookup
+_PADDED = np.hstack([EFFECTIVENESS, np.ones((len(POKEMON_TYPES), 1))])
+DUAL_EFFECTIVENESS = _PADDED[:, :, None] * _PADDED[:, None, :]
+
+# Everything is calculated at level 50 with neutral natures and no IVs or EVs; the random
+# roll is uniform between 0.85 and 1, so its expected value is used
+LEVEL = 50
+STAB = 1.5
+AVERAGE_ROLL = 0.925
+
+DAMAGE_HEADERS = ["Move", "Type", "Category", "Power", "Accuracy", "Effectiveness", "Damage", "% of HP"]
+TARGET_HEADERS = ["ID", "Name", "Type", "Effectiveness", "Damage", "% of HP"]
+
+
+def load_type_pairs(repository, ids):
+    """Returns an array of each Pokémon's two type indexes in ids order, NO_TYPE for a missing second type.
+
+    Types come from PokemonTypes, where misspellings in Pokemon.Type were already corrected.
+    """
+    position = {pokemon_id: row for row, pokemon_id in enumerate(ids)}
+    type_pairs = np.full((len(position), 2), NO_TYPE, dtype=np.int64)
+    for pokemon_id, slot, type_name in repository.fetchall("SELECT pokemon_id, slot, type FROM PokemonTypes"):
+        type_pairs[position[pokemon_id], slot - 1] = TYPE_INDEX[type_name]
+    return type_pairs
+
+
+class DamageCalculator:
+    """Expected damage of every damaging move and Pokémon, evaluated as whole NumPy arrays."""
+
+    def __init__(self, repository):
+        rows = repository.fetchall("SELECT ID, Name, HP, Attack, Def, Spatk, Spdef FROM Pokemon ORDER BY ID")
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = [row[1] for row in rows]
+
+        # Level 50 stats: HP is base + 60 and the others base + 5
+        base = np.array([row[2:] for row in rows], dtype=np.float64)
+        self.hp = base[:, 0] + LEVEL + 10
+        self.attack, self.defense, self.special_attack, self.special_defense = (base[:, 1:] + 5).T
+
+        self.rows = RowIndex(self.ids)
+
+        self.type_pairs = load_type_pairs(repository, self.ids.tolist())
+        self.types = ['/'.join(POKEMON_TYPES[index] for index in pair if index != NO_TYPE)
+                      for pair in self.type_pairs.tolist()]
+
+        # Effectiveness of each attacking type against every Pokémon, gathered once from the dual-type table
+        self.effectiveness = DUAL_EFFECTIVENESS[:, self.type_pairs[:, 0], self.type_pairs[:, 1]]
+
+        # Only moves with a power and a damage category can be calculated; a missing accuracy never misses
+        rows = repository.fetchall("SELECT Name, Type, Cat, Power, Acc FROM Moves WHERE Power IS NOT NULL "
+                                   "AND Cat IN ('Physical', 'Special') ORDER BY Name")
+        self.move_rows = rows
+        self.move_names = [row[0] for row in rows]
+        self.move_index = {name.casefold(): index for index, name in enumerate(self.move_names)}
+        self.move_types = np.array([TYPE_INDEX[row[1]] for row in rows], dtype=np.int64)
+        self.move_special = np.array([row[2] == 'Special' for row in rows])
+        self.move_power = np.array([row[3] for row in rows], dtype=np.float64)
+        self.move_accuracy = np.array([100 if row[4] is None else row[4] for row in rows], dtype=np.float64) / 100
+
+    def move_of(self, move_name):
+        try:
+            return self.move_index[move_name.casefold()]
+        except KeyError:
+            raise KeyError(f"No damaging move called '{move_name}'.") from None
+
+    def damage(self, power, attack, defense, effectiveness, stab, accuracy):
+        # The main series formula; every argument may be a scalar or an array of matching shape
+        base = (2 * LEVEL / 5 + 2) * power * attack / defense / 50 + 2
+        return base * stab * effectiveness * accuracy * AVERAGE_ROLL
+
+    def moves_against(self, attacker_id, defender_id):
+        """Returns rows matching DAMAGE_HEADERS for every damaging move, strongest first."""
+        attacker, defender = self.rows.row_of(attacker_id), self.rows.row_of(defender_id)
+        attack = np.where(self.move_special, self.special_attack[attacker], self.attack[attacker])
+        defense = np.where(self.move_special, self.special_defense[defender], self.defense[defender])
+        effectiveness = self.effectiveness[self.move_types, defender]
+        stab = np.where(np.isin(self.move_types, self.type_pairs[attacker]), STAB, 1.0)
+
+        damage = self.damage(self.move_power, attack, defense, effectiveness, stab, self.move_accuracy)
+        percent = damage / self.hp[defender] * 100
+        order = np.argsort(-damage, kind="stable")
+        return [self.move_rows[index] + (effectiveness, round(damage, 1), round(percent, 1))
+                for index, effectiveness, damage, percent in zip(order.tolist(), effectiveness[order].tolist(),
+                                                                 damage[order].tolist(), percent[order].tolist())]
+
+    def move_against_all(self, attacker_id, move_name):
+        """Returns rows matching TARGET_HEADERS for one move against every Pokémon, most damaged first."""
+        attacker, move = self.rows.row_of(attacker_id), self.move_of(move_name)
+        if self.move_special[move]:
+            attack, defense = self.special_attack[attacker], self.special_defense
+        else:
+            attack, defense = self.attack[attacker], self.defense
+        effectiveness = self.effectiveness[self.move_types[move]]
+        stab = STAB if self.move_types[move] in self.type_pairs[attacker] else 1.0
+
+        damage = self.damage(self.move_power[move], attack, defense, effectiveness, stab, self.move_accuracy[move])
+        percent = damage / self.hp * 100
+        order = np.argsort(-percent, kind="stable")
+        return [(pokemon_id, self.names[index], self.types[index], effectiveness, round(damage, 1), round(percent, 1))
+                for index, pokemon_id, effectiveness, damage, percent in zip(
+                    order.tolist(), self.ids[order].tolist(), effectiveness[order].tolist(), damage[order].tolist(),
+                    percent[order].tolist())]
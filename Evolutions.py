@@ -0,0 +1,119 @@
+import json
+import os
+
+from NameIndex import NameIndex
+
+
+# Cache of the built graph, kept next to the database it was built from
+CACHE_NAME = '.evolutions.json'
+CACHE_VERSION = 1
+
+# Evolution values naming a Mega or Primal form, or N/A, are not links to another Pokémon
+FORM_PREFIXES = ("Mega ", "Primal ")
+NO_EVOLUTION = "N/A"
+
+
+def evolution_targets(evolution):
+    # 'Poliwrath/Politoed' names two branches; 'Mega Charizard X/Y' names forms, not Pokémon
+    if not evolution or evolution == NO_EVOLUTION or evolution.startswith(FORM_PREFIXES):
+        return []
+    return [name.strip() for name in evolution.split('/') if name.strip()]
+
+
+def database_stamp(db_path):
+    # The cache is only reused for the exact Data.db file it was built from
+    status = os.stat(db_path)
+    return [status.st_size, status.st_mtime_ns]
+
+
+class EvolutionGraph:
+    """Every evolution family as forward and reverse links between IDs, built once from Pokemon.Evolution."""
+
+    def __init__(self, names, forward):
+        self.names = names
+        self.forward = forward
+        self.name_ids = {name.casefold(): pokemon_id for pokemon_id, name in names.items()}
+
+        self.reverse = {}
+        for pokemon_id, targets in forward.items():
+            for target in targets:
+                self.reverse.setdefault(target, []).append(pokemon_id)
+
+        # Each family is a list of (ID, stage) in stage order, starting from the Pokémon with no pre-evolution
+        self.families = []
+        self.family_of = {}
+        for root in sorted(pokemon_id for pokemon_id in names if pokemon_id not in self.reverse):
+            family = []
+            stage_members = [root]
+            stage = 0
+            while stage_members:
+                family.extend((pokemon_id, stage) for pokemon_id in stage_members)
+                self.family_of.update((pokemon_id, len(self.families)) for pokemon_id in stage_members)
+                stage_members = list(dict.fromkeys(
+                    target for pokemon_id in stage_members for target in forward.get(pokemon_id, ())
+                    if target not in self.family_of))
+                stage += 1
+            self.families.append(family)
+
+    @classmethod
+    def build(cls, repository):
+        """Builds the graph, resolving misspelt evolution names to the closest Pokémon name."""
+        rows = repository.fetchall("SELECT ID, Name, Evolution FROM Pokemon ORDER BY ID")
+        names = {pokemon_id: name for pokemon_id, name, evolution in rows}
+        name_ids = {name.casefold(): pokemon_id for pokemon_id, name in names.items()}
+        name_index = NameIndex(names.values())
+
+        forward = {}
+        for pokemon_id, name, evolution in rows:
+            for target in evolution_targets(evolution):
+                target_id = name_ids.get(target.casefold())
+                if target_id is None:
+                    matches = name_index.fuzzy(target, limit=1)
+                    target_id = name_ids[matches[0].casefold()] if matches else None
+                if target_id is not None and target_id != pokemon_id:
+                    forward.setdefault(pokemon_id, []).append(target_id)
+        return cls(names, forward)
+
+    @classmethod
+    def load(cls, repository, cache_path=None):
+        """Returns the cached graph if Data.db is unchanged since it was built, otherwise rebuilds and caches it."""
+        cache_path = cache_path or os.path.join(os.path.dirname(os.path.abspath(repository.db_path)), CACHE_NAME)
+        stamp = database_stamp(repository.db_path)
+        try:
+            with open(cache_path, encoding="utf-8") as cache:
+                cached = json.load(cache)
+            if cached["version"] == CACHE_VERSION and cached["stamp"] == stamp:
+                # JSON object keys are strings, so IDs are converted back
+                return cls({int(pokemon_id): name for pokemon_id, name in cached["names"].items()},
+                           {int(pokemon_id): targets for pokemon_id, targets in cached["forward"].items()})
+        except (OSError, ValueError, KeyError):
+            pass
+
+        graph = cls.build(repository)
+        graph.save(cache_path, stamp)
+        return graph
+
+    def save(self, cache_path, stamp):
+        # Written under a temporary name first so a reader never sees a half-written cache
+        temporary_path = f"{cache_path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as cache:
+                json.dump({"version": CACHE_VERSION, "stamp": stamp, "names": self.names, "forward": self.forward},
+                          cache)
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            pass  # A read-only install still works, it just rebuilds the graph each start
+
+    def id_of(self, name):
+        return self.name_ids.get(name.casefold())
+
+    def family(self, pokemon_id):
+        """Returns the whole family of a Pokémon as (ID, name, stage) in stage order."""
+        family = self.families[self.family_of[pokemon_id]] if pokemon_id in self.family_of else [(pokemon_id, 0)]
+        return [(member_id, self.names.get(member_id), stage) for member_id, stage in family]
+
+    def evolves_from(self, pokemon_id):
+        return self.reverse.get(pokemon_id, [])
+
+    def evolves_to(self, pokemon_id):
+        return self.forward.get(pokemon_id, [])
@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+
+# Directory holding the original artwork and the default thumbnail size
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Images')
+THUMBNAILS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.thumbnails')
+THUMBNAIL_SIZE = 100
+
+
+class ThumbnailStore:
+    """On-disk cache of pre-scaled artwork, regenerated when the source image changes."""
+
+    def __init__(self, images_dir=IMAGES_DIR, thumbnails_dir=THUMBNAILS_DIR, size=THUMBNAIL_SIZE):
+        self.images_dir = images_dir
+        self.thumbnails_dir = thumbnails_dir
+        self.size = size
+        os.makedirs(thumbnails_dir, exist_ok=True)
+
+    def source_path(self, pokemon_id):
+        return os.path.join(self.images_dir, f'{pokemon_id}.jpg')
+
+    def thumbnail_path(self, pokemon_id):
+        return os.path.join(self.thumbnails_dir, f'{pokemon_id}_{self.size}.png')
+
+    def load(self, pokemon_id):
+        """Returns the scaled QImage for a Pokémon, or a null QImage if there is no artwork."""
+        source_path = self.source_path(pokemon_id)
+        try:
+            source_mtime = os.stat(source_path).st_mtime_ns
+        except OSError:
+            return QImage()
+
+        # A thumbnail is only reused if it was written for this exact source mtime
+        thumbnail_path = self.thumbnail_path(pokemon_id)
+        try:
+            if os.stat(thumbnail_path).st_mtime_ns == source_mtime:
+                image = QImage(thumbnail_path)
+                if not image.isNull():
+                    return image
+        except OSError:
+            pass
+
+        image = QImage(source_path)
+        if image.isNull():
+            return image
+        image = image.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        # Stamps the thumbnail with the source mtime so edits to the source invalidate it; the file is
+        # written under a temporary name first because two threads may generate the same thumbnail
+        temporary_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+        if image.save(temporary_path, 'PNG'):
+            os.utime(temporary_path, ns=(source_mtime, source_mtime))
+            os.replace(temporary_path, thumbnail_path)
+        return image
+
+
+class PixmapCache:
+    """Bounded LRU cache of scaled QPixmaps in front of a ThumbnailStore."""
+
+    def __init__(self, store=None, capacity=256):
+        self.store = store if store is not None else ThumbnailStore()
+        self.capacity = capacity
+        self.pixmaps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pokemon_id):
+        """Returns the scaled QPixmap for a Pokémon, or None if there is no artwork."""
+        pixmap = self.cached(pokemon_id)
+        if pixmap is not None:
+            return pixmap
+        return self.add_image(pokemon_id, self.store.load(pokemon_id))
+
+    def cached(self, pokemon_id):
+        """Returns the QPixmap if it is already in memory, or None without loading anything."""
+        pixmap = self.pixmaps.get(pokemon_id)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.pixmaps.move_to_end(pokemon_id)
+        self.hits += 1
+        return pixmap
+
+    def add_image(self, pokemon_id, image):
+        """Caches a QImage decoded elsewhere as a QPixmap; must be called on the GUI thread."""
+        if image.isNull():
+            return None
+        pixmap = QPixmap.fromImage(image)
+        self.put(pokemon_id, pixmap)
+        return pixmap
+
+    def put(self, pokemon_id, pixmap):
+        self.pixmaps[pokemon_id] = pixmap
+        self.pixmaps.move_to_end(pokemon_id)
+        while len(self.pixmaps) > self.capacity:
+            self.pixmaps.popitem(last=False)
+
+    def clear(self):
+        self.pixmaps.clear()
+        self.hits = 0
+        self.misses = 0
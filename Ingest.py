@@ -0,0 +1,242 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtGui import QImage
+
+from Migrations import migrate, normalize_type, CATEGORY_CORRECTIONS
+from Repository import DEFAULT_DB_PATH
+from ImageCache import IMAGES_DIR, THUMBNAILS_DIR, ThumbnailStore
+from SpriteArchive import DEFAULT_ARCHIVE_PATH, FULL_SIZE, SpriteArchive, build_archive, encode_image
+
+
+# Table columns, in the same order as POKEMON_FIELDS and MOVE_FIELDS
+POKEMON_COLUMNS = ["ID", "Name", "Type", "Total", "HP", "Attack", "Def", "Spatk", "Spdef", "Speed", "Evolution"]
+MOVE_COLUMNS = ["Name", "Type", "Cat", "Power", "Acc", "PP"]
+
+# Source artwork is matched to a Pokémon by its file name, such as 25.png
+ARTWORK_PATTERN = re.compile(r"^(\d+)\.(jpe?g|png|webp)$", re.IGNORECASE)
+
+
+def read_records(path):
+    """Reads a dump as a list of dicts: CSV with a header row, a JSON array, or JSON Lines."""
+    with open(path, encoding="utf-8", newline="") as dump:
+        if path.lower().endswith(".csv"):
+            records = list(csv.DictReader(dump))
+        else:
+            text = dump.read().strip()
+            records = json.loads(text) if text.startswith("[") else [json.loads(line) for line in text.splitlines()
+                                                                     if line.strip()]
+
+    # Output from Pokedex.py also lists the keys it could not find, which carry no data
+    return [record for record in records if record.get("found") not in (False, "False")]
+
+
+def optional_int(value):
+    # Missing Power, Accuracy and PP values are written as '-', left empty or null
+    if value is None or str(value).strip() in ("", "-"):
+        return None
+    return int(value)
+
+
+def pokemon_row(record):
+    pokemon_type = "/".join(normalize_type(type_name) for type_name in str(record["type"]).split("/"))
+    return (int(record["id"]), record["name"].strip(), pokemon_type, int(record["total"]), int(record["hp"]),
+            int(record["attack"]), optional_int(record["defense"]), int(record["sp_atk"]), int(record["sp_def"]),
+            int(record["speed"]), (record.get("evolution") or "N/A").strip())
+
+
+def move_row(record):
+    category = record["category"].strip()
+    return (record["name"].strip(), normalize_type(record["type"]), CATEGORY_CORRECTIONS.get(category, category),
+            optional_int(record["power"]), optional_int(record["accuracy"]), optional_int(record["pp"]))
+
+
+def parse_records(path, to_row):
+    rows = []
+    for number, record in enumerate(read_records(path), start=1):
+        try:
+            rows.append(to_row(record))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"{path}, record {number}: {e!r}") from None
+    return rows
+
+
+def upsert_rows(conn, table, columns, rows, prune=False):
+    """Writes the rows that are new or differ from the table, keyed by the first column.
+
+    Returns (changed keys, removed keys); with prune, rows missing from the dump are deleted.
+    """
+    key = columns[0]
+    existing = {row[0]: row for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}")}
+
+    # Comparing the stored content first means an unchanged row is never rewritten
+    changed = [row for row in rows if existing.get(row[0]) != row]
+    if changed:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                         f"ON CONFLICT({key}) DO UPDATE SET {updates}", changed)
+
+    removed = []
+    if prune:
+        incoming = {row[0] for row in rows}
+        removed = [row_key for row_key in existing if row_key not in incoming]
+        conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", [(row_key,) for row_key in removed])
+    return [row[0] for row in changed], removed
+
+
+def ingest_rows(db_path, pokemon_rows=None, move_rows=None, prune=False):
+    """Upserts Pokémon and move rows in one transaction and returns counts of what changed."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    summary = {}
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if pokemon_rows is not None:
+                changed, removed = upsert_rows(conn, "Pokemon", POKEMON_COLUMNS, pokemon_rows, prune)
+
+                # PokemonTypes mirrors Pokemon.Type, so it is rewritten for every changed or removed Pokémon
+                stale = [(pokemon_id,) for pokemon_id in changed + removed]
+                conn.executemany("DELETE FROM PokemonTypes WHERE pokemon_id = ?", stale)
+                conn.executemany("DELETE FROM ArtworkHashes WHERE pokemon_id = ?", [(key,) for key in removed])
+                types_by_id = {row[0]: row[2] for row in pokemon_rows}
+                conn.executemany("INSERT INTO PokemonTypes (pokemon_id, slot, type) VALUES (?, ?, ?)",
+                                 [(pokemon_id, slot, type_name) for pokemon_id in changed
+                                  for slot, type_name in enumerate(types_by_id[pokemon_id].split("/"), start=1)])
+                summary["pokemon"] = (len(pokemon_rows), len(changed), len(removed))
+
+            if move_rows is not None:
+                changed, removed = upsert_rows(conn, "Moves", MOVE_COLUMNS, move_rows, prune)
+                summary["moves"] = (len(move_rows), len(changed), len(removed))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        # Refreshes the planner's statistics only when something was written
+        if any(counts[1] or counts[2] for counts in summary.values()):
+            conn.execute("PRAGMA optimize")
+        return summary
+    finally:
+        conn.close()
+
+
+def file_hash(path):
+    with open(path, "rb") as source:
+        return hashlib.sha256(source.read()).hexdigest()
+
+
+def encode_artwork(source_path, target_path):
+    # Re-encodes one source image as a JPEG no larger than FULL_SIZE, the format Images/ holds
+    image = QImage(source_path)
+    if image.isNull():
+        return False
+    data = encode_image(image, min(FULL_SIZE, max(image.width(), image.height())))
+    temporary_path = f"{target_path}.tmp"
+    with open(temporary_path, "wb") as target:
+        target.write(data)
+    os.replace(temporary_path, target_path)
+    return True
+
+
+def ingest_artwork(db_path, source_dir, images_dir=IMAGES_DIR, thumbnails_dir=THUMBNAILS_DIR,
+                   archive_path=DEFAULT_ARCHIVE_PATH, pack=False, max_workers=None):
+    """Re-encodes the source images whose hash changed since the last ingest and returns counts.
+
+    New thumbnails are written at the same time. An existing sprite archive is updated when
+    anything changed, and with pack a missing one is built.
+    """
+    if os.path.realpath(source_dir) == os.path.realpath(images_dir):
+        raise ValueError("The artwork dump must be a different directory from the one the app loads.")
+    sources = {}
+    for name in os.listdir(source_dir):
+        match = ARTWORK_PATTERN.match(name)
+        if match:
+            sources[int(match.group(1))] = os.path.join(source_dir, name)
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        known = dict(conn.execute("SELECT pokemon_id, sha256 FROM ArtworkHashes"))
+        store = ThumbnailStore(images_dir, thumbnails_dir)
+
+        # Hashing, decoding, scaling and encoding all run in Qt or hashlib, so threads use every core
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            hashes = dict(zip(sources, executor.map(file_hash, sources.values())))
+            changed = [pokemon_id for pokemon_id, digest in hashes.items() if known.get(pokemon_id) != digest]
+
+            def process(pokemon_id):
+                if not encode_artwork(sources[pokemon_id], os.path.join(images_dir, f"{pokemon_id}.jpg")):
+                    return False
+                store.load(pokemon_id)
+                return True
+
+            encoded = [pokemon_id for pokemon_id, ok in zip(changed, executor.map(process, changed)) if ok]
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("INSERT INTO ArtworkHashes (pokemon_id, sha256) VALUES (?, ?) "
+                         "ON CONFLICT(pokemon_id) DO UPDATE SET sha256 = excluded.sha256",
+                         [(pokemon_id, hashes[pokemon_id]) for pokemon_id in encoded])
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    packed = None
+    if (encoded and os.path.exists(archive_path)) or (pack and not os.path.exists(archive_path)):
+        # An archive built with --full keeps its full-size images, which also lets its entries be reused
+        full_size = None
+        try:
+            archive = SpriteArchive(archive_path, images_dir=images_dir)
+        except (OSError, ValueError):
+            archive = None
+        if archive is not None:
+            full_size = FULL_SIZE if archive.has_full_size() else None
+            archive.close()
+        packed = build_archive(images_dir, archive_path, full_size=full_size, max_workers=max_workers,
+                               changed=set(encoded))
+    return {"images": (len(sources), len(encoded), len(changed) - len(encoded)), "packed": packed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update Data.db and Images/ from local CSV or JSON dumps.")
+    parser.add_argument("--pokemon", help="CSV, JSON or JSON Lines file of Pokémon, with Pokedex.py's field names")
+    parser.add_argument("--moves", help="CSV, JSON or JSON Lines file of moves, with Pokedex.py's field names")
+    parser.add_argument("--images", help="directory of source artwork named <id>.jpg, .png or .webp")
+    parser.add_argument("--prune", action="store_true", help="delete Pokémon and moves missing from the dumps")
+    parser.add_argument("--pack", action="store_true", help="build Sprites.pak even if it does not exist yet")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="path to Data.db")
+    args = parser.parse_args(argv)
+    if not (args.pokemon or args.moves or args.images):
+        parser.error("nothing to ingest; pass --pokemon, --moves or --images")
+
+    migrate(args.db)
+    start = time.perf_counter()
+    try:
+        pokemon_rows = parse_records(args.pokemon, pokemon_row) if args.pokemon else None
+        move_rows = parse_records(args.moves, move_row) if args.moves else None
+        summary = ingest_rows(args.db, pokemon_rows, move_rows, args.prune)
+        if args.images:
+            summary.update(ingest_artwork(args.db, args.images, pack=args.pack))
+    except (OSError, ValueError) as e:
+        print(f"Ingest failed: {e}", file=sys.stderr)
+        return 1
+
+    for kind in ("pokemon", "moves", "images"):
+        if kind in summary:
+            total, changed, removed = summary[kind]
+            detail = "failed to decode" if kind == "images" else "removed"
+            print(f"{kind.capitalize()}: {total} read, {changed} written, {removed} {detail}")
+    if summary.get("packed") is not None:
+        print(f"Packed {summary['packed']} images into {DEFAULT_ARCHIVE_PATH}")
+    print(f"Done in {time.perf_counter() - start:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
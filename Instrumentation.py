@@ -0,0 +1,149 @@
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+
+# Upper bounds of the histogram buckets in milliseconds; one more bucket holds everything slower
+BUCKET_BOUNDS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+# Operations slower than one 60 Hz frame are logged, keeping the most recent ones
+SLOW_OPERATION_MS = 16
+SLOW_LOG_SIZE = 200
+
+DIAGNOSTICS_HEADERS = ["Operation", "Count", "p50 ms", "p99 ms", "Max ms", "Mean ms"]
+
+
+def memory_usage():
+    """Returns (KB, kind): "resident" memory on Linux, the "peak" on other Unix systems, or (None, None)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024, "resident"
+    except OSError:
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return None, None
+
+    # ru_maxrss is in KB, except on macOS where it is in bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak // 1024 if sys.platform == "darwin" else peak), "peak"
+
+
+class LatencyHistogram:
+    """Counts of one operation's latencies in fixed buckets, so percentiles cost no stored samples."""
+
+    __slots__ = ("count", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket holding the given fraction of samples, capped at the maximum."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(BUCKET_BOUNDS_MS[bucket], self.max_ms) if bucket < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": dict(zip([f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"],
+                                self.buckets)),
+        }
+
+
+class Instrumentation:
+    """Latency histograms per operation and a log of slow operations, fed from any thread."""
+
+    def __init__(self, slow_ms=SLOW_OPERATION_MS, log_size=SLOW_LOG_SIZE):
+        self.slow_ms = slow_ms
+        self.histograms = {}
+        self.slow_operations = deque(maxlen=log_size)
+        self.started = time.time()
+
+        # Queries and image loads are recorded from pool threads as well as the GUI thread
+        self.lock = threading.Lock()
+
+    def record(self, operation, seconds, detail=None):
+        elapsed_ms = seconds * 1000
+        with self.lock:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                histogram = self.histograms[operation] = LatencyHistogram()
+            histogram.add(elapsed_ms)
+            if elapsed_ms >= self.slow_ms:
+                self.slow_operations.append((time.time(), operation, elapsed_ms, detail))
+
+    @contextmanager
+    def timed(self, operation, detail=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, time.perf_counter() - start, detail)
+
+    def wrap(self, operation, func):
+        """Returns func timed as operation, for work handed to another thread."""
+        def timed_func(*args):
+            start = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self.record(operation, time.perf_counter() - start, args[0] if args else None)
+        return timed_func
+
+    def snapshot(self):
+        memory, memory_kind = memory_usage()
+        with self.lock:
+            return {
+                "uptime_s": time.time() - self.started,
+                "memory_kb": memory,
+                "memory_kind": memory_kind,
+                "operations": {operation: histogram.as_dict()
+                               for operation, histogram in sorted(self.histograms.items())},
+                "slow_operations": [{"time": timestamp, "operation": operation, "elapsed_ms": elapsed_ms,
+                                     "detail": None if detail is None else str(detail)}
+                                    for timestamp, operation, elapsed_ms, detail in self.slow_operations],
+            }
+
+    def rows(self, snapshot=None):
+        """Returns one row per operation matching DIAGNOSTICS_HEADERS, slowest p99 first."""
+        operations = (snapshot or self.snapshot())["operations"]
+        rows = [(operation, histogram["count"], round(histogram["p50_ms"], 2), round(histogram["p99_ms"], 2),
+                 round(histogram["max_ms"], 2), round(histogram["mean_ms"], 2))
+                for operation, histogram in operations.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def dump(self, path):
+        """Writes the snapshot as JSON."""
+        with open(path, "w", encoding="utf-8") as dump:
+            json.dump(self.snapshot(), dump, indent=2)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.slow_operations.clear()
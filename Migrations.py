@@ -0,0 +1,141 @@
+import sqlite3
+
+# Misspellings found in the scraped data, mapped to the real type names
+TYPE_CORRECTIONS = {
+    "Dragpn": "Dragon",
+    "Graas": "Grass",
+    "Posion": "Poison",
+}
+
+# Misspelled or misplaced move categories, mapped to the real category
+CATEGORY_CORRECTIONS = {
+    "Physica": "Physical",
+    "Physicl": "Physical",
+    "Fighting": "Physical",
+    "Speical": "Special",
+    "SPecial": "Special",
+}
+
+
+def normalize_type(type_name):
+    type_name = type_name.strip()
+    return TYPE_CORRECTIONS.get(type_name, type_name)
+
+
+def add_type_tables(conn):
+    """Splits Pokémon types into an indexed PokemonTypes table and indexes Moves.Type."""
+    conn.execute("""
+        CREATE TABLE PokemonTypes (
+        pokemon_id INTEGER NOT NULL REFERENCES Pokemon(ID),
+        slot INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        PRIMARY KEY (pokemon_id, slot)
+        ) WITHOUT ROWID
+    """)
+
+    # Dual types are stored as one "Grass/Poison" string, so each half gets its own slot
+    rows = []
+    for pokemon_id, pokemon_type in conn.execute("SELECT ID, Type FROM Pokemon"):
+        for slot, type_name in enumerate(pokemon_type.split("/"), start=1):
+            rows.append((pokemon_id, slot, normalize_type(type_name)))
+    conn.executemany("INSERT INTO PokemonTypes (pokemon_id, slot, type) VALUES (?, ?, ?)", rows)
+    conn.execute("CREATE INDEX idx_pokemon_types_type ON PokemonTypes(type, pokemon_id)")
+
+    # Move types are a single canonical name per row once misspellings are fixed
+    for wrong, right in TYPE_CORRECTIONS.items():
+        conn.execute("UPDATE Moves SET Type = ? WHERE Type = ?", (right, wrong))
+    conn.execute("CREATE INDEX idx_moves_type ON Moves(Type)")
+
+
+def add_numeric_move_columns(conn):
+    """Rebuilds Moves with integer Power/Acc/PP columns, NULL where the data has '-'."""
+    conn.execute("""
+        CREATE TABLE MovesNumeric (
+        Name TEXT NOT NULL PRIMARY KEY,
+        Type TEXT NOT NULL,
+        Cat TEXT NOT NULL,
+        Power INTEGER,
+        Acc INTEGER,
+        PP INTEGER
+        )
+    """)
+    conn.execute("""
+        INSERT INTO MovesNumeric (Name, Type, Cat, Power, Acc, PP)
+        SELECT Name, Type, Cat,
+               CAST(NULLIF(Power, '-') AS INTEGER),
+               CAST(NULLIF(Acc, '-') AS INTEGER),
+               CAST(NULLIF(PP, '-') AS INTEGER)
+        FROM Moves ORDER BY rowid
+    """)
+    for wrong, right in CATEGORY_CORRECTIONS.items():
+        conn.execute("UPDATE MovesNumeric SET Cat = ? WHERE Cat = ?", (right, wrong))
+
+    # Dropping the old table also drops idx_moves_type, so it is recreated on the new one
+    conn.execute("DROP TABLE Moves")
+    conn.execute("ALTER TABLE MovesNumeric RENAME TO Moves")
+    conn.execute("CREATE INDEX idx_moves_type ON Moves(Type)")
+    conn.execute("CREATE INDEX idx_moves_power ON Moves(Power)")
+    conn.execute("CREATE INDEX idx_moves_acc ON Moves(Acc)")
+    conn.execute("CREATE INDEX idx_moves_pp ON Moves(PP)")
+
+    # Gives the planner row counts so it picks the most selective range index
+    conn.execute("ANALYZE")
+
+
+def add_name_indexes(conn):
+    """Indexes Pokémon and move names case-insensitively for exact name lookups."""
+    conn.execute("CREATE INDEX idx_pokemon_name ON Pokemon(Name COLLATE NOCASE)")
+    conn.execute("CREATE INDEX idx_moves_name ON Moves(Name COLLATE NOCASE)")
+
+
+def add_artwork_hashes(conn):
+    """Records a hash of the source image each Images/<id>.jpg was encoded from, for Ingest.py."""
+    conn.execute("""
+        CREATE TABLE ArtworkHashes (
+        pokemon_id INTEGER PRIMARY KEY,
+        sha256 TEXT NOT NULL
+        )
+    """)
+
+
+# Every schema change, in the order it is applied; a migration's version is its position + 1
+MIGRATIONS = [
+    add_type_tables,
+    add_numeric_move_columns,
+    add_name_indexes,
+    add_artwork_hashes,
+]
+
+
+def schema_version(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS SchemaVersion (version INTEGER NOT NULL)")
+    version = conn.execute("SELECT MAX(version) FROM SchemaVersion").fetchone()[0]
+    return version or 0
+
+
+def migrate(db_path):
+    """Applies any migrations the database at db_path has not seen yet, each in its own transaction."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        while True:
+            # The version is read under the write lock, so a second process opening the same file
+            # waits for the first one's step and then skips it instead of applying it again
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = schema_version(conn)
+                if version < len(MIGRATIONS):
+                    MIGRATIONS[version](conn)
+                    conn.execute("INSERT INTO SchemaVersion (version) VALUES (?)", (version + 1,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if version >= len(MIGRATIONS):
+                return len(MIGRATIONS)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    from Repository import DEFAULT_DB_PATH
+    print(f"Data.db is at schema version {migrate(DEFAULT_DB_PATH)}")
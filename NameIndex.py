@@ -0,0 +1,90 @@
+from bisect import bisect_left
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """Returns the Levenshtein distance between a and b, or max_distance + 1 if it is larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+
+        # Every later row is at least this row's minimum, so stop once it is out of range
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def deletions(word, max_distance):
+    """Returns every string made by deleting up to max_distance characters from word, including word."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+class NameIndex:
+    """Sorted in-memory index of names supporting prefix lookups and typo-tolerant fallback."""
+
+    def __init__(self, names, max_distance=2):
+        # Keys are case-folded so lookups ignore case, and the original spelling is kept for display
+        entries = sorted((name.casefold(), name) for name in set(names))
+        self.keys = [key for key, name in entries]
+        self.names = [name for key, name in entries]
+
+        # Maps every deletion variant of a name back to the name, so two strings within
+        # max_distance edits always share a variant and typos are found by dict lookups
+        self.max_distance = max_distance
+        self.variants = {}
+        for position, key in enumerate(self.keys):
+            for variant in deletions(key, max_distance):
+                self.variants.setdefault(variant, []).append(position)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix(self, query, limit=10):
+        """Returns up to limit names starting with query, in alphabetical order."""
+        query = query.casefold()
+        start = bisect_left(self.keys, query)
+        matches = []
+        for position in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[position].startswith(query):
+                break
+            matches.append(self.names[position])
+        return matches
+
+    def fuzzy(self, query, max_distance=2, limit=10):
+        """Returns up to limit names within max_distance edits of query, closest first."""
+        query = query.casefold()
+        max_distance = min(max_distance, self.max_distance)
+        candidates = set()
+        for variant in deletions(query, max_distance):
+            candidates.update(self.variants.get(variant, ()))
+
+        # Shared variants only suggest a match, so each candidate is verified
+        scored = []
+        for position in candidates:
+            distance = bounded_edit_distance(query, self.keys[position], max_distance)
+            if distance <= max_distance:
+                scored.append((distance, self.keys[position], self.names[position]))
+        scored.sort()
+        return [name for distance, key, name in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """Returns prefix matches, falling back to close spellings when nothing starts with query."""
+        query = query.strip()
+        if not query:
+            return []
+        matches = self.prefix(query, limit)
+        if matches:
+            return matches
+
+        # Allows one typo in short names and two in longer ones
+        return self.fuzzy(query, 1 if len(query) <= 4 else 2, limit)
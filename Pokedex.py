@@ -0,0 +1,126 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+from Repository import PokedexRepository, DEFAULT_DB_PATH, MAX_BATCH
+
+
+# All 18 types, in the order the search screens list them
+POKEMON_TYPES = ['Fire', 'Water', 'Grass', 'Electric', 'Ice', 'Fighting', 'Flying',
+                 'Poison', 'Ground', 'Rock', 'Bug', 'Ghost', 'Steel', 'Dragon',
+                 'Dark', 'Fairy', 'Normal', 'Psychic']
+
+# Field names used for rows from the Pokemon and Moves tables in JSON and CSV output
+POKEMON_FIELDS = ["id", "name", "type", "total", "hp", "attack", "defense", "sp_atk", "sp_def", "speed", "evolution"]
+MOVE_FIELDS = ["name", "type", "category", "power", "accuracy", "pp"]
+
+
+def format_pokemon(row):
+    return (f"ID: {row[0]}, Name: {row[1]}, Type: {row[2]}, Total: {row[3]}, "
+            f"HP: {row[4]}, Attack: {row[5]}, Defense: {row[6]}, SpAtk: {row[7]}, "
+            f"SpDef: {row[8]}, Speed: {row[9]}, Evolution: {row[10]}")
+
+
+def format_move(row):
+    # Moves without a Power, Accuracy or PP value are stored as NULL and shown as '-'
+    power, accuracy, pp = ('-' if value is None else value for value in row[3:6])
+    return (f"Name: {row[0]}, Type: {row[1]}, Category: {row[2]}, "
+            f"Power: {power}, Accuracy: {accuracy}, PP: {pp}\n")
+
+
+def resolve_pokemon(repository, keys):
+    """Looks up a batch of IDs and names with one query for each kind, in input order.
+
+    Returns (key, row) pairs, with row None for keys that match nothing.
+    """
+    ids = [int(key) for key in keys if key.isdigit()]
+    names = [key for key in keys if not key.isdigit()]
+    by_id = {row[0]: row for row in repository.fetch_pokemon_by_ids(ids)} if ids else {}
+    by_name = {row[1].casefold(): row for row in repository.fetch_pokemon_by_names(names)} if names else {}
+    return [(key, by_id.get(int(key)) if key.isdigit() else by_name.get(key.casefold())) for key in keys]
+
+
+def resolve_moves(repository, keys):
+    """Looks up a batch of move names with one query, returning (key, row) pairs in input order."""
+    by_name = {row[0].casefold(): row for row in repository.fetch_moves_by_names(keys)} if keys else {}
+    return [(key, by_name.get(key.casefold())) for key in keys]
+
+
+def resolve_rows(keys, ids, names):
+    """Turns names or IDs into positions in the parallel ids and names lists, in input order.
+
+    Raises ValueError naming the first key that matches nothing.
+    """
+    id_rows = {pokemon_id: row for row, pokemon_id in enumerate(ids)}
+    name_rows = {name.casefold(): row for row, name in enumerate(names)}
+    rows = []
+    for key in keys:
+        key = key.strip()
+        row = id_rows.get(int(key)) if key.isdigit() else name_rows.get(key.casefold())
+        if row is None:
+            raise ValueError(f"No Pokémon called '{key}'.")
+        rows.append(row)
+    return rows
+
+
+def read_batches(lines, batch_size=MAX_BATCH):
+    # Groups non-empty input lines so each group is resolved with one IN (...) query
+    batch = []
+    for line in lines:
+        key = line.strip()
+        if key:
+            batch.append(key)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up Pokémon or moves in bulk, one name or ID per line.")
+    parser.add_argument("input", nargs="?", default="-", help="file with one name or ID per line (default: stdin)")
+    parser.add_argument("--moves", action="store_true", help="look up move names instead of Pokémon")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="path to Data.db")
+    args = parser.parse_args(argv)
+
+    # Opening a missing path would create an empty database, so a mistyped --db is reported instead
+    if not os.path.isfile(args.db):
+        parser.error(f"no database at {args.db}")
+
+    repository = PokedexRepository(args.db)
+    resolve, fields = (resolve_moves, MOVE_FIELDS) if args.moves else (resolve_pokemon, POKEMON_FIELDS)
+    lines = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+
+    # Rows are written as soon as their batch is resolved, so output streams for large inputs
+    writer = None
+    if args.format == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(["query", "found"] + fields)
+
+    missing = 0
+    try:
+        for batch in read_batches(lines):
+            for key, row in resolve(repository, batch):
+                missing += row is None
+                if writer is not None:
+                    writer.writerow([key, row is not None] + (list(row) if row else [""] * len(fields)))
+                else:
+                    record = {"query": key, "found": row is not None}
+                    if row:
+                        record.update(zip(fields, row))
+                    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        repository.close()
+
+    # Exits with 1 when anything could not be found, so scripts can notice
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import logging
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QPixmap
+
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchSignals(QObject):
+    # Carries (generation, pokemon_id, row, image) back to the GUI thread
+    loaded = pyqtSignal(int, int, object, object)
+
+
+class PrefetchTask(QRunnable):
+    """Loads one Pokémon's row and scaled artwork on a pool thread."""
+
+    def __init__(self, prefetcher, generation, pokemon_id, load_image):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.generation = generation
+        self.pokemon_id = pokemon_id
+        self.load_image = load_image
+
+    def run(self):
+        # Skips the work entirely if the user has already moved somewhere else
+        if self.generation != self.prefetcher.generation:
+            return
+
+        row = image = None
+        try:
+            row = self.prefetcher.repository.fetch_pokemon_by_id(self.pokemon_id)
+            if self.load_image:
+                # QImage can be decoded off the GUI thread; QPixmap is built on arrival
+                image = self.prefetcher.pixmap_cache.store.load(self.pokemon_id)
+        except Exception:
+            # Prefetching is only a speed-up, so a failure leaves the Pokémon to be loaded when it is shown
+            logger.exception("Prefetching Pokémon %d failed", self.pokemon_id)
+            row = image = None
+        self.prefetcher.signals.loaded.emit(self.generation, self.pokemon_id, row, image)
+
+
+class Prefetcher(QObject):
+    """Loads the Pokémon around the current one in the background during arrow navigation."""
+
+    def __init__(self, repository, pixmap_cache, radius=5, capacity=32, parent=None):
+        super().__init__(parent)
+        self.repository = repository
+        self.pixmap_cache = pixmap_cache
+        self.radius = radius
+        self.capacity = capacity
+
+        # Rows that have been loaded, oldest first, bounded by capacity
+        self.rows = OrderedDict()
+        self.window = range(0)
+        self.generation = 0
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+
+        self.signals = PrefetchSignals()
+        self.signals.loaded.connect(self.on_loaded)
+
+    def prefetch_around(self, pokemon_id):
+        """Queues the next and previous `radius` Pokémon, cancelling work for the old position."""
+        self.generation += 1
+        self.pool.clear()  # Drops queued tasks that have not started yet
+
+        first = max(self.repository.min_id, pokemon_id - self.radius)
+        last = min(self.repository.max_id, pokemon_id + self.radius)
+        self.window = range(first, last + 1)
+        self.trim()
+
+        # Loads the nearest neighbours first, alternating forwards and backwards
+        for distance in range(1, self.radius + 1):
+            for neighbour_id in (pokemon_id + distance, pokemon_id - distance):
+                if neighbour_id not in self.window or neighbour_id in self.rows:
+                    continue
+                load_image = neighbour_id not in self.pixmap_cache.pixmaps
+                self.pool.start(PrefetchTask(self, self.generation, neighbour_id, load_image))
+
+    def get_row(self, pokemon_id):
+        """Returns a prefetched row, or None if it has not been loaded."""
+        return self.rows.get(pokemon_id)
+
+    def on_loaded(self, generation, pokemon_id, row, image):
+        # Results that are no longer near the current Pokémon are dropped
+        if pokemon_id not in self.window or row is None:
+            return
+
+        self.rows[pokemon_id] = row
+        self.rows.move_to_end(pokemon_id)
+        if image is not None and not image.isNull() and pokemon_id not in self.pixmap_cache.pixmaps:
+            self.pixmap_cache.put(pokemon_id, QPixmap.fromImage(image))
+        self.trim()
+
+    def trim(self):
+        # Forgets rows outside the window first, then the oldest ones beyond capacity
+        for pokemon_id in [pokemon_id for pokemon_id in self.rows if pokemon_id not in self.window]:
+            del self.rows[pokemon_id]
+        while len(self.rows) > self.capacity:
+            self.rows.popitem(last=False)
+
+    def shutdown(self):
+        self.generation += 1
+        self.pool.clear()
+        self.pool.waitForDone()
@@ -0,0 +1,25 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Data for the work run in this process, set by init_worker when a pool starts it
+_worker_data = None
+
+
+def init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def worker_data(data=None):
+    """Returns data when it is given, so work can also run in-process, otherwise the copy this worker received."""
+    return data if data is not None else _worker_data
+
+
+def start_pool(data, max_workers):
+    """Returns a process pool whose workers each receive one copy of data when they start.
+
+    Workers are spawned rather than forked, because the GUI process has running threads.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=init_worker, initargs=(data,))
@@ -0,0 +1,100 @@
+import re
+
+from Migrations import normalize_type
+
+
+# First and last National Dex ID of each generation
+GENERATION_RANGES = {
+    1: (1, 151),
+    2: (152, 251),
+    3: (252, 386),
+    4: (387, 493),
+    5: (494, 649),
+    6: (650, 721),
+    7: (722, 809),
+    8: (810, 905),
+    9: (906, 1025),
+}
+
+# Stat names accepted in a search, mapped to their Pokemon column
+STAT_COLUMNS = {
+    "total": "Total",
+    "hp": "HP",
+    "attack": "Attack",
+    "atk": "Attack",
+    "defense": "Def",
+    "def": "Def",
+    "spatk": "Spatk",
+    "spdef": "Spdef",
+    "speed": "Speed",
+    "spe": "Speed",
+}
+
+STAT_PATTERN = re.compile(r"^([a-z]+)(>=|<=|=|>|<)(\d+)$")
+RANGE_PATTERN = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+def parse_range(value, name):
+    match = RANGE_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Expected a number or a range like 1-3 for {name}, got '{value}'.")
+    first = int(match.group(1))
+    last = int(match.group(2) or first)
+    return min(first, last), max(first, last)
+
+
+def plan_search(text):
+    """Turns one search box input into a single SQL query and its parameters.
+
+    Accepts an ID ("25"), a name ("Mr. Mime"), or any mix of criteria such as
+    "type:fire type:flying speed>=100 gen:1-3 id:1-151 char". Raises ValueError
+    for criteria it does not understand.
+    """
+    conditions = []
+    params = []
+    name_words = []
+
+    text = text.strip()
+    if text.isdigit():
+        return "SELECT * FROM Pokemon WHERE ID = ?", (int(text),)
+
+    for token in text.split():
+        lowered = token.lower()
+        key, separator, value = lowered.partition(":")
+        stat_match = STAT_PATTERN.match(lowered)
+
+        # A colon with nothing after it is part of a name, as in "Type: Null"
+        separator = separator if value else ""
+
+        if separator and key == "type":
+            # Each type criterion is an indexed lookup in PokemonTypes
+            conditions.append("ID IN (SELECT pokemon_id FROM PokemonTypes WHERE type = ?)")
+            params.append(normalize_type(value.capitalize()))
+        elif separator and key in ("gen", "generation"):
+            first, last = parse_range(value, "gen")
+            if first not in GENERATION_RANGES or last not in GENERATION_RANGES:
+                raise ValueError(f"Generations go from 1 to {len(GENERATION_RANGES)}.")
+            conditions.append("ID BETWEEN ? AND ?")
+            params.extend((GENERATION_RANGES[first][0], GENERATION_RANGES[last][1]))
+        elif separator and key == "id":
+            conditions.append("ID BETWEEN ? AND ?")
+            params.extend(parse_range(value, "id"))
+        elif stat_match:
+            stat, operator, number = stat_match.groups()
+            if stat not in STAT_COLUMNS:
+                raise ValueError(f"Unknown stat '{stat}'. Use one of: {', '.join(sorted(STAT_COLUMNS))}.")
+            conditions.append(f"{STAT_COLUMNS[stat]} {operator} ?")
+            params.append(int(number))
+        elif separator:
+            raise ValueError(f"Unknown search criterion '{key}'. Use type:, gen: or id:.")
+        else:
+            name_words.append(token)
+
+    # Everything that is not a criterion is the Pokémon's name, matched through the NOCASE index
+    if name_words:
+        conditions.append("Name = ? COLLATE NOCASE")
+        params.append(" ".join(name_words))
+
+    if not conditions:
+        raise ValueError("Enter a Pokémon ID, a name, or criteria such as type:fire speed>=100 gen:1-3.")
+    return f"SELECT * FROM Pokemon WHERE {' AND '.join(conditions)} ORDER BY ID", tuple(params)
@@ -0,0 +1,165 @@
+import sqlite3
+import os
+import threading
+import time
+
+from Migrations import migrate
+from QueryPlanner import plan_search
+
+
+# Default location of the database, next to the application code
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data.db')
+
+# Type searches go through the PokemonTypes and Moves.Type indexes
+SEARCH_POKEMON_BY_TYPE = ("SELECT Pokemon.* FROM PokemonTypes "
+                          "JOIN Pokemon ON Pokemon.ID = PokemonTypes.pokemon_id "
+                          "WHERE PokemonTypes.type = ? ORDER BY PokemonTypes.pokemon_id")
+SEARCH_MOVES_BY_TYPE = "SELECT * FROM Moves WHERE Type = ?"
+
+# Most values bound into one IN (...) list, well under SQLite's parameter limit
+MAX_BATCH = 500
+
+# Columns the move filter can sort by, keyed by the name shown in the UI
+MOVE_SORT_COLUMNS = {
+    "Power": "Power",
+    "Accuracy": "Acc",
+    "PP": "PP",
+    "Name": "Name",
+}
+
+
+def build_move_filter(move_type=None, category=None, min_power=None, max_power=None,
+                      min_accuracy=None, max_accuracy=None, min_pp=None, max_pp=None,
+                      sort_by="Power", descending=True):
+    """Builds the SQL and parameters for a move filter; bounds left as None are not applied."""
+    conditions = []
+    params = []
+    for condition, value in (
+        ("Type = ?", move_type),
+        ("Cat = ?", category),
+        ("Power >= ?", min_power),
+        ("Power <= ?", max_power),
+        ("Acc >= ?", min_accuracy),
+        ("Acc <= ?", max_accuracy),
+        ("PP >= ?", min_pp),
+        ("PP <= ?", max_pp),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+
+    query = "SELECT * FROM Moves"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {MOVE_SORT_COLUMNS[sort_by]} {'DESC' if descending else 'ASC'}"
+    return query, tuple(params)
+
+
+class PokedexRepository:
+    """Read-only access to Data.db through one long-lived, tuned connection."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, instrumentation=None):
+        self.db_path = db_path
+
+        # Times every query when given an Instrumentation, see Instrumentation.py
+        self.instrumentation = instrumentation
+
+        # Brings an older Data.db up to the current schema before opening it read-only
+        migrate(db_path)
+
+        # Opens the database once in read-only mode; sqlite3 keeps a cache of
+        # prepared statements keyed by SQL text, so repeated lookups skip parsing
+        uri = f"file:{db_path}?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, cached_statements=256, check_same_thread=False)
+
+        # Background workers share the connection, so every query holds this lock
+        self.lock = threading.Lock()
+
+        # Counts statements sent to SQLite, so callers can check how many round trips a search costs
+        self.query_count = 0
+
+        # Tunes the connection for a small, read-mostly database
+        self.conn.execute("PRAGMA query_only = ON")
+        self.conn.execute("PRAGMA cache_size = -8192")  # 8 MB page cache
+        self.conn.execute("PRAGMA mmap_size = 67108864")  # Map up to 64 MB
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+
+        # Caches metadata that never changes while the app is running
+        self.min_id, self.max_id = self.conn.execute("SELECT MIN(ID), MAX(ID) FROM Pokemon").fetchone()
+        self.pokemon_count = self.conn.execute("SELECT COUNT(*) FROM Pokemon").fetchone()[0]
+        self.move_count = self.conn.execute("SELECT COUNT(*) FROM Moves").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def fetchone(self, query, params=()):
+        start = time.perf_counter()
+        with self.lock:
+            self.query_count += 1
+            row = self.conn.execute(query, params).fetchone()
+        if self.instrumentation is not None:
+            self.instrumentation.record("db.fetchone", time.perf_counter() - start, query)
+        return row
+
+    def fetchall(self, query, params=()):
+        # The time includes waiting for the lock, which is what the caller actually waits
+        start = time.perf_counter()
+        with self.lock:
+            self.query_count += 1
+            rows = self.conn.execute(query, params).fetchall()
+        if self.instrumentation is not None:
+            self.instrumentation.record("db.fetchall", time.perf_counter() - start, query)
+        return rows
+
+    def fetch_pokemon_by_id(self, pokemon_id):
+        return self.fetchone("SELECT * FROM Pokemon WHERE ID = ?", (pokemon_id,))
+
+    def fetch_pokemon_by_name(self, pokemon_name):
+        return self.fetchone("SELECT * FROM Pokemon WHERE Name = ? COLLATE NOCASE", (pokemon_name,))
+
+    def fetch_in_batches(self, query, values):
+        # Runs query once per MAX_BATCH values, with {} replaced by the placeholders for that batch
+        rows = []
+        for start in range(0, len(values), MAX_BATCH):
+            batch = tuple(values[start:start + MAX_BATCH])
+            rows.extend(self.fetchall(query.format(", ".join("?" * len(batch))), batch))
+        return rows
+
+    def fetch_pokemon_by_ids(self, pokemon_ids):
+        return self.fetch_in_batches("SELECT * FROM Pokemon WHERE ID IN ({})", list(pokemon_ids))
+
+    def fetch_pokemon_by_names(self, pokemon_names):
+        return self.fetch_in_batches("SELECT * FROM Pokemon WHERE Name COLLATE NOCASE IN ({})", list(pokemon_names))
+
+    def fetch_moves_by_names(self, move_names):
+        return self.fetch_in_batches("SELECT * FROM Moves WHERE Name COLLATE NOCASE IN ({})", list(move_names))
+
+    def search_pokemon(self, text):
+        """Runs one search box input as a single query, see QueryPlanner.plan_search."""
+        query, params = plan_search(text)
+        return self.fetchall(query, params)
+
+    def search_pokemon_by_type(self, pokemon_type):
+        return self.fetchall(SEARCH_POKEMON_BY_TYPE, (pokemon_type,))
+
+    def fetch_moves_by_name(self, move_name):
+        return self.fetchall("SELECT * FROM Moves WHERE Name = ? COLLATE NOCASE", (move_name,))
+
+    def search_moves_by_type(self, move_type):
+        return self.fetchall(SEARCH_MOVES_BY_TYPE, (move_type,))
+
+    def filter_moves(self, **criteria):
+        """Returns the moves matching numeric ranges, see build_move_filter for the criteria."""
+        query, params = build_move_filter(**criteria)
+        return self.fetchall(query, params)
+
+    def pokemon_names(self):
+        return [row[0] for row in self.fetchall("SELECT Name FROM Pokemon")]
+
+    def move_names(self):
+        return [row[0] for row in self.fetchall("SELECT Name FROM Moves")]
+
+    def explain(self, query, params=()):
+        """Returns the detail lines of EXPLAIN QUERY PLAN for a query."""
+        return [row[3] for row in self.fetchall(f"EXPLAIN QUERY PLAN {query}", params)]
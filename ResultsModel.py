@@ -0,0 +1,70 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+# Column headers for rows from the Pokemon and Moves tables
+POKEMON_HEADERS = ["ID", "Name", "Type", "Total", "HP", "Attack", "Def", "SpAtk", "SpDef", "Speed", "Evolution"]
+MOVE_HEADERS = ["Name", "Type", "Category", "Power", "Accuracy", "PP"]
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """Table model over query results that hands rows to the view in batches as it scrolls."""
+
+    def __init__(self, headers, batch_size=100, parent=None):
+        super().__init__(parent)
+        self.headers = headers
+        self.batch_size = batch_size
+        self.rows = []
+        self.loaded = 0
+
+    def set_rows(self, rows):
+        # Only the first batch is exposed; the view asks for more through fetchMore
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.loaded = min(self.batch_size, len(self.rows))
+        self.endResetModel()
+
+    def row(self, row_number):
+        return self.rows[row_number]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return "-" if value is None else str(value)
+        if role == Qt.UserRole:
+            return value
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.batch_size, len(self.rows) - self.loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Sorts every row, not just the loaded ones, and keeps empty values at the bottom
+        self.layoutAboutToBeChanged.emit()
+        present = [row for row in self.rows if row[column] is not None]
+        missing = [row for row in self.rows if row[column] is None]
+        present.sort(key=lambda row: row[column], reverse=order == Qt.DescendingOrder)
+        self.rows = present + missing
+        self.layoutChanged.emit()
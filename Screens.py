@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+
+class ScreenRegistry:
+    """Builds each screen of a QStackedWidget on first use and reuses it afterwards."""
+
+    def __init__(self, stacked_widget, capacity=4):
+        self.stacked_widget = stacked_widget
+        self.capacity = capacity
+        self.factories = {}
+        self.evict_callbacks = {}
+        self.pinned = set()
+
+        # Built screens, least recently shown first
+        self.screens = OrderedDict()
+
+    def register(self, name, factory, on_evict=None, pinned=False):
+        """Registers a function that builds and returns the widget for a screen.
+
+        on_evict is called before the screen's widgets are freed, to stop work that reports to them.
+        A pinned screen is never evicted for capacity and does not count towards it.
+        """
+        self.factories[name] = factory
+        if on_evict is not None:
+            self.evict_callbacks[name] = on_evict
+        if pinned:
+            self.pinned.add(name)
+
+    def get(self, name):
+        """Returns the screen's widget, building it if it is not cached."""
+        screen = self.screens.get(name)
+        if screen is None:
+            screen = self.factories[name]()
+            self.stacked_widget.addWidget(screen)
+            self.screens[name] = screen
+        self.screens.move_to_end(name)
+        self.evict_least_recently_used(keep=name)
+        return screen
+
+    def show(self, name):
+        screen = self.get(name)
+        self.stacked_widget.setCurrentWidget(screen)
+        # The previous screen is no longer on display, so it can be evicted now if over capacity
+        self.evict_least_recently_used(keep=name)
+        return screen
+
+    def evict(self, name):
+        """Removes a screen and frees its widgets; it is rebuilt the next time it is shown."""
+        screen = self.screens.pop(name, None)
+        if screen is not None:
+            if name in self.evict_callbacks:
+                self.evict_callbacks[name]()
+            self.stacked_widget.removeWidget(screen)
+            screen.deleteLater()
+
+    def evict_least_recently_used(self, keep=None):
+        # Keeps at most capacity unpinned screens built, never evicting the one on display or the one requested
+        evictable = [name for name in self.screens if name not in self.pinned]
+        excess = len(evictable) - self.capacity
+        for name in evictable:
+            if excess <= 0:
+                break
+            if name != keep and self.screens[name] is not self.stacked_widget.currentWidget():
+                self.evict(name)
+                excess -= 1
+
+    def clear(self):
+        for name in list(self.screens):
+            self.evict(name)
@@ -0,0 +1,202 @@
+import mmap
+import os
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage
+
+from ImageCache import IMAGES_DIR, THUMBNAIL_SIZE
+
+
+# Packed artwork for every Pokémon, built from Images/ by running this module
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Sprites.pak')
+FULL_SIZE = 475
+
+# File layout: header, then one index entry per Pokémon sorted by ID, then the encoded images.
+# Offsets are from the start of the file; a full-size length of 0 means it was not packed.
+# Each entry also records the mtime and size of the source image it was packed from.
+MAGIC = b"PKSPRITE"
+VERSION = 2
+HEADER = struct.Struct("<8sHHI")  # magic, version, thumbnail size, entry count
+ENTRY = struct.Struct("<IQIQIqQ")  # pokemon id, thumbnail offset and length, full offset and length, source stamp
+
+
+def source_stamp(image_path):
+    # An entry is only current while its source still has the mtime and size it was packed with
+    try:
+        status = os.stat(image_path)
+    except OSError:
+        return None
+    return status.st_mtime_ns, status.st_size
+
+
+def encode_image(image, size, quality=90):
+    # Scales an image to fit in size x size and encodes it as JPEG bytes
+    scaled = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    scaled.save(buffer, "JPG", quality)
+    return bytes(data)
+
+
+def encode_sprite(image_path, thumbnail_size, full_size):
+    image = QImage(image_path)
+    if image.isNull():
+        return None
+    full = encode_image(image, full_size) if full_size else b""
+    return encode_image(image, thumbnail_size), full
+
+
+def build_archive(images_dir=IMAGES_DIR, archive_path=DEFAULT_ARCHIVE_PATH,
+                  thumbnail_size=THUMBNAIL_SIZE, full_size=None, max_workers=None, changed=None):
+    """Packs every Images/<id>.jpg into one archive of pre-scaled JPEGs and returns the entry count.
+
+    With a set of changed IDs, every other image is copied from the existing archive instead of re-encoded.
+    """
+    pokemon_ids = sorted(int(match.group(1)) for match in
+                         (re.match(r"^(\d+)\.jpg$", name) for name in os.listdir(images_dir)) if match)
+    stamps = {pokemon_id: source_stamp(os.path.join(images_dir, f"{pokemon_id}.jpg")) for pokemon_id in pokemon_ids}
+
+    previous = {}
+    if changed is not None:
+        try:
+            archive = SpriteArchive(archive_path, images_dir=images_dir)
+        except (OSError, ValueError):
+            archive = None
+        if archive is not None:
+            # Entries are only reusable if they were packed with the same sizes from the same source
+            if archive.size == thumbnail_size:
+                for pokemon_id in pokemon_ids:
+                    if pokemon_id in archive and pokemon_id not in changed and \
+                            archive.stamp(pokemon_id) == stamps[pokemon_id] and \
+                            (archive.full_data(pokemon_id) is not None) == bool(full_size):
+                        previous[pokemon_id] = (bytes(archive.thumbnail_data(pokemon_id)),
+                                                bytes(archive.full_data(pokemon_id) or b""))
+            archive.close()
+
+    # Decoding and scaling happen inside Qt, so a thread pool spreads them over the available cores
+    to_encode = [pokemon_id for pokemon_id in pokemon_ids if pokemon_id not in previous]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        encoded = dict(zip(to_encode, executor.map(
+            lambda pokemon_id: encode_sprite(os.path.join(images_dir, f"{pokemon_id}.jpg"), thumbnail_size, full_size),
+            to_encode)))
+    packed = [(pokemon_id, previous.get(pokemon_id) or encoded[pokemon_id]) for pokemon_id in pokemon_ids]
+    packed = [(pokemon_id, sprite) for pokemon_id, sprite in packed if sprite is not None]
+
+    entries = []
+    offset = HEADER.size + ENTRY.size * len(packed)
+    for pokemon_id, (thumbnail, full) in packed:
+        mtime, size = stamps[pokemon_id] or (0, 0)
+        entries.append(ENTRY.pack(pokemon_id, offset, len(thumbnail), offset + len(thumbnail) if full else 0, len(full),
+                                  mtime, size))
+        offset += len(thumbnail) + len(full)
+
+    # Written under a temporary name so a running app never maps a half-written archive
+    temporary_path = f"{archive_path}.tmp"
+    with open(temporary_path, "wb") as archive:
+        archive.write(HEADER.pack(MAGIC, VERSION, thumbnail_size, len(packed)))
+        archive.writelines(entries)
+        for pokemon_id, (thumbnail, full) in packed:
+            archive.write(thumbnail)
+            archive.write(full)
+    os.replace(temporary_path, archive_path)
+    return len(packed)
+
+
+class SpriteArchive:
+    """Memory-mapped view of a sprite archive; a drop-in image store for PixmapCache."""
+
+    def __init__(self, archive_path=DEFAULT_ARCHIVE_PATH, fallback=None, images_dir=IMAGES_DIR):
+        self.archive_path = archive_path
+        self.images_dir = images_dir
+
+        # Store used for artwork added or edited after the archive was built, such as a ThumbnailStore
+        self.fallback = fallback
+        with open(archive_path, "rb") as archive:
+            # The mapping keeps a single descriptor for every image instead of one open per view
+            self.mapping = mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+
+        # Whether each entry still matches its source, checked on the first load rather than on every one
+        self.current = {}
+
+        try:
+            magic, version, self.size, count = HEADER.unpack_from(self.mapping, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{archive_path} is not a version {VERSION} sprite archive.")
+
+            self.entries = {}
+            for position in range(count):
+                pokemon_id, *location = ENTRY.unpack_from(self.mapping, HEADER.size + position * ENTRY.size)
+                self.entries[pokemon_id] = location
+        except struct.error:
+            self.close()
+            raise ValueError(f"{archive_path} is truncated.") from None
+        except ValueError:
+            self.close()
+            raise
+
+    @classmethod
+    def open_default(cls, fallback=None):
+        """Returns the archive next to the app, or None if it has not been built or cannot be read."""
+        try:
+            return cls(fallback=fallback)
+        except (OSError, ValueError):
+            return None
+
+    def __contains__(self, pokemon_id):
+        return pokemon_id in self.entries
+
+    def thumbnail_data(self, pokemon_id):
+        # A slice of the memoryview shares memory with the mapping instead of copying it
+        thumbnail_offset, thumbnail_length = self.entries[pokemon_id][:2]
+        return self.view[thumbnail_offset:thumbnail_offset + thumbnail_length]
+
+    def full_data(self, pokemon_id):
+        full_offset, full_length = self.entries[pokemon_id][2:4]
+        if not full_length:
+            return None
+        return self.view[full_offset:full_offset + full_length]
+
+    def has_full_size(self):
+        """Returns whether the archive was built with full-size images, as with --full."""
+        return any(location[3] for location in self.entries.values())
+
+    def stamp(self, pokemon_id):
+        """Returns the (mtime, size) of the source image the entry was packed from."""
+        return tuple(self.entries[pokemon_id][4:6])
+
+    def is_current(self, pokemon_id):
+        # A missing source still counts as current, so the archive keeps serving once the loose files are gone
+        current = self.current.get(pokemon_id)
+        if current is None:
+            stamp = source_stamp(os.path.join(self.images_dir, f"{pokemon_id}.jpg"))
+            current = self.current[pokemon_id] = stamp is None or stamp == self.stamp(pokemon_id)
+        return current
+
+    def load(self, pokemon_id):
+        """Returns the thumbnail as a QImage, or a null QImage if the Pokémon has no artwork.
+
+        Artwork edited since the archive was built comes from the fallback store instead.
+        """
+        if self.fallback is not None and (pokemon_id not in self.entries or not self.is_current(pokemon_id)):
+            return self.fallback.load(pokemon_id)
+        if pokemon_id not in self.entries:
+            return QImage()
+        return QImage.fromData(self.thumbnail_data(pokemon_id))
+
+    def close(self):
+        self.view.release()
+        self.mapping.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Passing --full also packs a larger copy of each image for detail views
+    count = build_archive(full_size=FULL_SIZE if "--full" in sys.argv else None)
+    print(f"Packed {count} images into {DEFAULT_ARCHIVE_PATH} "
+          f"({os.path.getsize(DEFAULT_ARCHIVE_PATH) / 1024:.0f} KB)")
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+# Stat columns of the matrix, in order; Total is kept last so the six base stats are a contiguous slice
+STAT_NAMES = ["HP", "Attack", "Defense", "SpAtk", "SpDef", "Speed", "Total"]
+BASE_STATS = slice(0, 6)
+
+# Weighted stat combinations offered for ranking, besides ranking by a single stat
+RANKING_PRESETS = {
+    "Physical attacker": {"Attack": 1.0, "Speed": 1.0},
+    "Special attacker": {"SpAtk": 1.0, "Speed": 1.0},
+    "Physical wall": {"HP": 1.0, "Defense": 1.0},
+    "Special wall": {"HP": 1.0, "SpDef": 1.0},
+}
+
+
+class RowIndex:
+    """Maps Pokémon IDs to row positions through a plain array, which is fast because IDs are dense."""
+
+    def __init__(self, ids):
+        self.position = np.full(ids.max() + 1, -1, dtype=np.int64)
+        self.position[ids] = np.arange(len(ids))
+
+    def row_of(self, pokemon_id):
+        if not 0 <= pokemon_id < len(self.position) or self.position[pokemon_id] < 0:
+            raise KeyError(f"No Pokémon with ID {pokemon_id}.")
+        return self.position[pokemon_id]
+
+
+class StatsEngine:
+    """Base stats of every Pokémon in one contiguous NumPy matrix, with vectorized queries over it."""
+
+    def __init__(self, repository):
+        rows = repository.fetchall("SELECT ID, Name, HP, Attack, Def, Spatk, Spdef, Speed, Total "
+                                   "FROM Pokemon ORDER BY ID")
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = [row[1] for row in rows]
+        self.stats = np.ascontiguousarray([row[2:] for row in rows], dtype=np.float64)
+
+        # IDs are looked up constantly, so they map to row positions through an array
+        self.rows = RowIndex(self.ids)
+
+        # Percentile of every stat of every Pokémon: the share of Pokémon with a lower or equal value
+        sorted_stats = np.sort(self.stats, axis=0)
+        self.percentiles = np.empty_like(self.stats)
+        for column in range(self.stats.shape[1]):
+            self.percentiles[:, column] = np.searchsorted(sorted_stats[:, column], self.stats[:, column],
+                                                          side="right")
+        self.percentiles *= 100.0 / len(self.ids)
+
+        # Unit-length base stat vectors, so cosine similarity is a single matrix-vector product
+        base = self.stats[:, BASE_STATS]
+        self.unit_stats = base / np.linalg.norm(base, axis=1, keepdims=True)
+
+    def weights_for(self, weights):
+        # Accepts a stat name, a {stat: weight} mapping or a preset name and returns a weight vector
+        if isinstance(weights, str):
+            weights = RANKING_PRESETS.get(weights, {weights: 1.0})
+        vector = np.zeros(len(STAT_NAMES))
+        for stat, weight in weights.items():
+            vector[STAT_NAMES.index(stat)] = weight
+        return vector
+
+    def rank(self, weights, top=25, descending=True):
+        """Returns the top Pokémon IDs and scores by a stat, preset or weighted combination of stats."""
+        scores = self.stats @ self.weights_for(weights)
+        if not descending:
+            scores = -scores
+        top = min(top, len(scores))
+
+        # argpartition finds the top entries in linear time; only those few are then sorted
+        best = np.argpartition(scores, -top)[-top:]
+        best = best[np.argsort(scores[best], kind="stable")[::-1]]
+        return self.ids[best].tolist(), (scores[best] if descending else -scores[best]).tolist()
+
+    def percentiles_of(self, pokemon_id):
+        """Returns {stat: percentile} for one Pokémon."""
+        return dict(zip(STAT_NAMES, self.percentiles[self.rows.row_of(pokemon_id)].tolist()))
+
+    def similar(self, pokemon_id, count=5, metric="cosine"):
+        """Returns the IDs and distances of the Pokémon whose base stat spread is closest to this one."""
+        row = self.rows.row_of(pokemon_id)
+        if metric == "cosine":
+            distances = 1.0 - self.unit_stats @ self.unit_stats[row]
+        elif metric == "euclidean":
+            differences = self.stats[:, BASE_STATS] - self.stats[row, BASE_STATS]
+            distances = np.sqrt(np.einsum("ij,ij->i", differences, differences))
+        else:
+            raise ValueError(f"Unknown metric '{metric}', use 'cosine' or 'euclidean'.")
+
+        # The Pokémon itself is always at distance 0, so it is pushed to the end
+        distances[row] = np.inf
+        count = min(count, len(distances) - 1)
+        nearest = np.argpartition(distances, count)[:count]
+        nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+        return self.ids[nearest].tolist(), distances[nearest].tolist()
+
+    def name_of(self, pokemon_id):
+        return self.names[self.rows.row_of(pokemon_id)]
@@ -0,0 +1,173 @@
+import heapq
+import os
+from concurrent.futures import as_completed
+
+from Pokedex import POKEMON_TYPES, resolve_rows
+from Damage import EFFECTIVENESS, DUAL_EFFECTIVENESS, TYPE_INDEX, NO_TYPE, load_type_pairs
+from ProcessPool import start_pool, worker_data
+
+
+TEAM_SIZE = 6
+BEAM_WIDTH = 200
+
+# Score weights for (types hit super effectively, types resisted less shared weaknesses, stat total per 100)
+DEFAULT_WEIGHTS = (1.0, 1.0, 0.5)
+
+TEAM_HEADERS = ["Score", "Team", "Covers", "Resists", "Shared Weak", "Total"]
+
+# A partial team's coverage is (offense, resists, weak at least once, weak at least twice, stat total),
+# where the first four are bitsets with one bit per type in POKEMON_TYPES order
+EMPTY_COVERAGE = (0, 0, 0, 0, 0)
+
+
+def type_mask(type_names):
+    mask = 0
+    for type_name in type_names:
+        mask |= 1 << TYPE_INDEX[type_name]
+    return mask
+
+
+def extend_coverage(data, coverage, row):
+    offense, resists, weak_once, weak_twice, total = coverage
+    weaknesses = data.weaknesses[row]
+    return (offense | data.offense[row], resists | data.resists[row], weak_once | weaknesses,
+            weak_twice | (weak_once & weaknesses), total + data.totals[row])
+
+
+def score_coverage(coverage, weights):
+    # A weakness shared by two members only counts against the team if nobody on it resists that type
+    offense, resists, weak_once, weak_twice, total = coverage
+    shared = weak_twice & ~resists
+    return (weights[0] * offense.bit_count() + weights[1] * (resists.bit_count() - shared.bit_count()) +
+            weights[2] * total / 100)
+
+
+class TeamData:
+    """Every Pokémon's stat total, Speed and type coverage as integer bitsets, sent once to each worker."""
+
+    __slots__ = ("ids", "names", "types", "type_masks", "totals", "speeds", "offense", "resists", "weaknesses")
+
+    def __init__(self, repository):
+        rows = repository.fetchall("SELECT ID, Name, Total, Speed FROM Pokemon ORDER BY ID")
+        self.ids = [row[0] for row in rows]
+        self.names = [row[1] for row in rows]
+        self.totals = [row[2] for row in rows]
+        self.speeds = [row[3] for row in rows]
+
+        pairs = load_type_pairs(repository, self.ids).tolist()
+        self.types = ['/'.join(POKEMON_TYPES[index] for index in pair if index != NO_TYPE) for pair in pairs]
+        self.type_masks = [type_mask(types.split('/')) for types in self.types]
+
+        # Offense counts the types a Pokémon's own types hit super effectively; defense uses the
+        # combined multiplier of both of its types
+        self.offense, self.resists, self.weaknesses = [], [], []
+        for first, second in pairs:
+            offense = resists = weaknesses = 0
+            for other in range(len(POKEMON_TYPES)):
+                if any(EFFECTIVENESS[own, other] >= 2 for own in (first, second) if own != NO_TYPE):
+                    offense |= 1 << other
+                multiplier = DUAL_EFFECTIVENESS[other, first, second]
+                if multiplier < 1:
+                    resists |= 1 << other
+                elif multiplier > 1:
+                    weaknesses |= 1 << other
+            self.offense.append(offense)
+            self.resists.append(resists)
+            self.weaknesses.append(weaknesses)
+
+    def candidates(self, banned_types=(), min_speed=0, exclude=()):
+        """Returns the rows worth considering for a team under the constraints.
+
+        Pokémon with identical coverage differ only in stat total, so only the strongest
+        TEAM_SIZE of each coverage are kept, which removes most of the search space.
+        """
+        banned = type_mask(banned_types)
+        by_coverage = {}
+        for row in range(len(self.ids)):
+            if self.type_masks[row] & banned or self.speeds[row] < min_speed or row in exclude:
+                continue
+            by_coverage.setdefault((self.offense[row], self.resists[row], self.weaknesses[row]), []).append(row)
+        return sorted(row for rows in by_coverage.values()
+                      for row in heapq.nlargest(TEAM_SIZE, rows, key=lambda row: self.totals[row]))
+
+
+def expand_teams(teams, candidates, width, weights, data=None):
+    """Adds every candidate to every partial team and returns the best width results as (score, team, coverage)."""
+    data = worker_data(data)
+    expanded = {}
+    for team, coverage in teams:
+        for row in candidates:
+            if row in team:
+                continue
+            # Teams are kept sorted, so the same members reached in a different order are only scored once
+            new_team = tuple(sorted(team + (row,)))
+            if new_team not in expanded:
+                expanded[new_team] = extend_coverage(data, coverage, row)
+    return heapq.nlargest(width, ((score_coverage(coverage, weights), team, coverage)
+                                  for team, coverage in expanded.items()))
+
+
+class TeamBuilder:
+    """Beam search for the 6-member teams with the best type coverage and stats, spread over worker processes.
+
+    Each step adds one member to every team in the beam; the beam is split into chunks that
+    the workers expand in parallel, and only the best width teams are carried to the next step.
+    """
+
+    def __init__(self, data, max_workers=None):
+        self.data = data
+        self.max_workers = max_workers or os.cpu_count()
+        self.executor = None
+
+    def search(self, top=10, banned_types=(), min_speed=0, required=(), progress=None, width=BEAM_WIDTH,
+               weights=DEFAULT_WEIGHTS):
+        """Returns up to top rows matching TEAM_HEADERS, best first.
+
+        progress(done, total) is called from the searching thread after each chunk.
+        """
+        required = resolve_rows(required, self.data.ids, self.data.names)
+        if len(set(required)) > TEAM_SIZE:
+            raise ValueError(f"A team has at most {TEAM_SIZE} Pokémon.")
+        unknown = set(banned_types) - set(POKEMON_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown type '{sorted(unknown)[0]}'.")
+
+        candidates = self.data.candidates(banned_types, min_speed, exclude=set(required))
+        coverage = EMPTY_COVERAGE
+        for row in set(required):
+            coverage = extend_coverage(self.data, coverage, row)
+        steps = TEAM_SIZE - len(set(required))
+        if len(candidates) < steps:
+            raise ValueError("Too few Pokémon match the constraints to fill a team.")
+
+        if self.executor is None:
+            self.executor = start_pool(self.data, self.max_workers)
+
+        beam = [(tuple(sorted(set(required))), coverage)]
+        chunk_count = self.max_workers * 4
+        for step in range(steps):
+            chunk_size = -(-len(beam) // chunk_count)
+            futures = [self.executor.submit(expand_teams, beam[start:start + chunk_size], candidates, width, weights)
+                       for start in range(0, len(beam), chunk_size)]
+
+            best = {}
+            for done, future in enumerate(as_completed(futures), start=1):
+                for score, team, team_coverage in future.result():
+                    best[team] = (score, team, team_coverage)
+                if progress is not None:
+                    progress(step * chunk_count + done * chunk_count // len(futures), steps * chunk_count)
+            beam = [(team, team_coverage) for score, team, team_coverage in heapq.nlargest(width, best.values())]
+
+        return [self.describe(team, weights) for team, coverage in beam[:top]]
+
+    def describe(self, team, weights=DEFAULT_WEIGHTS):
+        coverage = EMPTY_COVERAGE
+        for row in team:
+            coverage = extend_coverage(self.data, coverage, row)
+        offense, resists, weak_once, weak_twice, total = coverage
+        return (round(score_coverage(coverage, weights), 1), ", ".join(self.data.names[row] for row in team),
+                offense.bit_count(), resists.bit_count(), (weak_twice & ~resists).bit_count(), total)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,81 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget
+
+from Migrations import normalize_type
+
+
+# Default background used when no type is shown or the type is unknown
+DEFAULT_COLOR = "#2c3e50"
+
+# Define colors for different Pokémon types
+TYPE_COLORS = {
+    "Fire": "#FF4500",  # Red-orange
+    "Water": "#1E90FF",  # Blue
+    "Grass": "#32CD32",  # Green
+    "Electric": "#FFD700",  # Yellow
+    "Ice": "#ADD8E6",  # Light Blue
+    "Fighting": "#8B0000",  # Dark Red
+    "Flying": "#87CEEB",  # Sky Blue
+    "Poison": "#9400D3",  # Purple
+    "Ground": "#DEB887",  # Light Brown
+    "Rock": "#A52A2A",  # Brown
+    "Bug": "#9ACD32",  # Yellow-green
+    "Ghost": "#4B0082",  # Indigo
+    "Steel": "#B0C4DE",  # Light Steel Blue
+    "Dragon": "#4682B4",  # Steel Blue
+    "Dark": "#2F4F4F",  # Dark Slate Gray
+    "Fairy": "#FFB6C1",  # Light Pink
+    "Normal": "#D3D3D3",  # Light Gray
+    "Psychic": "#FF69B4",  # Hot Pink
+}
+
+# Buttons keep the same look whatever the background is
+BUTTON_STYLESHEET = "QPushButton { color: black; background-color: #f0f0f0; }"
+
+
+class TypeTheme:
+    """Precomputed background styles for every single and dual type, switched by a dynamic property."""
+
+    property_name = "pokemonType"
+
+    def __init__(self, type_colors=TYPE_COLORS, default_color=DEFAULT_COLOR):
+        self.type_colors = type_colors
+
+        # One rule per single type and per ordered pair of types, plus the default
+        rules = {"": f"background-color: {default_color};"}
+        for type_name, color in type_colors.items():
+            rules[type_name] = f"background-color: {color};"
+        for type1, color1 in type_colors.items():
+            for type2, color2 in type_colors.items():
+                if type1 != type2:
+                    rules[f"{type1}/{type2}"] = ("background: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, "
+                                                 f"stop:0 {color1}, stop:1 {color2});")
+        self.keys = frozenset(rules)
+
+        # The whole theme is one stylesheet, installed once on the top-level window; setting it on the
+        # container itself would make every repolish of the container re-resolve the sheet for its children
+        self.stylesheet = "\n".join([BUTTON_STYLESHEET] + [
+            f'QWidget#themeBackground[{self.property_name}="{key}"] {{ {rule} }}' for key, rule in rules.items()])
+
+    def key_for(self, pokemon_type):
+        """Maps a type string such as "Grass / Poison" to its rule key, or "" if it has no colors."""
+        key = "/".join(normalize_type(type_name) for type_name in pokemon_type.split("/")) if pokemon_type else ""
+        return key if key in self.keys else ""
+
+    def create_background(self):
+        """Creates the container whose background shows the current type."""
+        background = QWidget()
+        background.setObjectName("themeBackground")
+        background.setAttribute(Qt.WA_StyledBackground, True)
+        background.setProperty(self.property_name, "")
+        return background
+
+    def apply(self, background, pokemon_type):
+        # Repolishing just the container re-evaluates its own rule; nothing below it is restyled
+        key = self.key_for(pokemon_type)
+        if background.property(self.property_name) == key:
+            return
+        background.setProperty(self.property_name, key)
+        background.style().unpolish(background)
+        background.style().polish(background)
+        background.update()
@@ -0,0 +1,161 @@
+import logging
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+
+
+logger = logging.getLogger(__name__)
+
+
+class TaskSignals(QObject):
+    # Carries (channel, generation, result, error) back to the GUI thread
+    finished = pyqtSignal(str, int, object, object)
+
+
+class Task(QRunnable):
+    """Runs one function call on a pool thread and reports the result through TaskSignals."""
+
+    def __init__(self, runner, channel, generation, func, args):
+        super().__init__()
+        self.runner = runner
+        self.channel = channel
+        self.generation = generation
+        self.func = func
+        self.args = args
+
+    def run(self):
+        result = error = None
+        # Work that was superseded while it sat in the queue is skipped
+        if self.runner.generations[self.channel] == self.generation:
+            try:
+                result = self.func(*self.args)
+            except Exception as exception:
+                error = exception
+        self.runner.signals.finished.emit(self.channel, self.generation, result, error)
+
+
+class TaskRunner(QObject):
+    """Runs slow work off the GUI thread and drops results that a newer request has replaced.
+
+    Work is submitted on a named channel. Every submission gets the channel's next
+    generation token, and only the result for the latest token reaches its callback,
+    so a slow old search can never overwrite the answer to a newer one.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    # Carries (channel, error) for a failure that has no on_error callback
+    failed = pyqtSignal(str, object)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+        self.generations = {}
+        self.callbacks = {}
+        self.in_flight = 0
+
+        self.signals = TaskSignals()
+        self.signals.finished.connect(self.on_finished)
+
+    def submit(self, channel, func, *args, on_result, on_error=None, on_discard=None):
+        """Runs func(*args) on the pool and calls on_result(result) on the GUI thread if still current.
+
+        A result that arrives after it was superseded goes to on_discard instead, for releasing what it holds.
+        """
+        generation = self.generations.get(channel, 0) + 1
+        self.generations[channel] = generation
+        self.callbacks[(channel, generation)] = (on_result, on_error, on_discard)
+
+        self.in_flight += 1
+        if self.in_flight == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(Task(self, channel, generation, func, args))
+        return generation
+
+    def cancel(self, channel):
+        # Anything already submitted on the channel becomes stale
+        if channel in self.generations:
+            self.generations[channel] += 1
+
+    def on_finished(self, channel, generation, result, error):
+        on_result, on_error, on_discard = self.callbacks.pop((channel, generation))
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self.busy_changed.emit(False)
+
+        if generation != self.generations[channel]:
+            if result is not None and on_discard is not None:
+                on_discard(result)
+            return
+        if error is None:
+            on_result(result)
+        elif on_error is not None:
+            on_error(error)
+        else:
+            # Raising inside a slot would abort the whole application, so the error is logged and reported
+            logger.error("Task on channel %r failed", channel, exc_info=error)
+            self.failed.emit(channel, error)
+
+    def wait_for_done(self):
+        """Blocks until every task has finished and its callback has run; for scripts and benchmarks."""
+        while self.in_flight:
+            self.pool.waitForDone()
+            QCoreApplication.processEvents()
+
+    def shutdown(self):
+        for channel in self.generations:
+            self.generations[channel] += 1
+        self.pool.clear()
+        self.pool.waitForDone()
+
+
+class BatchRunner(QObject):
+    """Streams the results of a run's futures, such as process pool batches, to the GUI thread as they finish.
+
+    Starting a new run or cancelling drops the old run's remaining results, like a TaskRunner channel.
+    """
+
+    batch_finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    finished = pyqtSignal()
+
+    # Emitted from the executor's thread and delivered on the GUI thread
+    future_done = pyqtSignal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.futures = []
+        self.pending = 0
+        self.future_done.connect(self.on_future_done)
+
+    def start(self, futures):
+        self.cancel()
+        self.futures = futures
+        self.pending = len(futures)
+        generation = self.generation
+        for future in futures:
+            future.add_done_callback(lambda future: self.future_done.emit(generation, future))
+
+    def cancel(self):
+        for future in self.futures:
+            future.cancel()
+        self.futures = []
+        self.generation += 1
+
+    def is_running(self):
+        return bool(self.futures)
+
+    def on_future_done(self, generation, future):
+        if generation != self.generation or future.cancelled():
+            return
+        if future.exception() is not None:
+            self.cancel()
+            self.failed.emit(future.exception())
+            return
+        self.pending -= 1
+        self.batch_finished.emit(future.result())
+        if self.pending == 0:
+            self.futures = []
+            self.finished.emit()
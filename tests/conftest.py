@@ -0,0 +1,33 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to Core.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from Repository import PokedexRepository, DEFAULT_DB_PATH
+
+
+@pytest.fixture(scope="session")
+def db_path(tmp_path_factory):
+    # Migrations run on a copy, so the tracked Data.db is never rewritten by a test run
+    path = tmp_path_factory.mktemp("data") / "Data.db"
+    shutil.copyfile(DEFAULT_DB_PATH, path)
+    return str(path)
+
+
+@pytest.fixture
+def repository(db_path):
+    repository = PokedexRepository(db_path)
+    yield repository
+    repository.close()
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
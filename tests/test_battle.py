@@ -0,0 +1,64 @@
+from concurrent.futures import as_completed
+
+import pytest
+
+from Battle import BattleData, BattleSimulator, simulate_batch, batch_seeds, MAX_TEAM_SIZE
+
+
+@pytest.fixture(scope="module")
+def data(db_path):
+    from Repository import PokedexRepository
+    repository = PokedexRepository(db_path)
+    yield BattleData(repository)
+    repository.close()
+
+
+@pytest.fixture(scope="module")
+def teams(data):
+    return data.resolve_team(["Charizard", "Pikachu"]), data.resolve_team(["Blastoise", "Onix"])
+
+
+@pytest.mark.parametrize("random_opponents", [False, True])
+def test_same_seed_gives_identical_results(data, teams, random_opponents):
+    team_a, team_b = teams
+    team_b = [] if random_opponents else team_b
+    first = simulate_batch(team_a, team_b, 50, 1234, data=data)
+    assert simulate_batch(team_a, team_b, 50, 1234, data=data) == first
+    assert sum(first[:3]) == 50
+
+
+def test_batch_seeds_are_fixed_and_distinct():
+    seeds = batch_seeds(7, 20)
+    assert batch_seeds(7, 20) == seeds
+    assert len(set(seeds)) == len(seeds)
+    assert batch_seeds(8, 20) != seeds
+
+
+def test_totals_do_not_depend_on_which_batch_finishes_first(data, teams):
+    team_a, team_b = teams
+    seeds = batch_seeds(42, 6)
+    in_order = [simulate_batch(team_a, team_b, 20, seed, data=data) for seed in seeds]
+    reversed_order = [simulate_batch(team_a, team_b, 20, seed, data=data) for seed in reversed(seeds)][::-1]
+    assert reversed_order == in_order
+
+    # Batches on the worker pool finish in whatever order they like and still add up to the same totals
+    simulator = BattleSimulator(data, max_workers=2)
+    try:
+        finished = [future.result() for future in as_completed(simulator.submit(team_a, team_b, 120, seed=42,
+                                                                                batch_size=20))]
+    finally:
+        simulator.shutdown()
+    assert sorted(finished) == sorted(in_order)
+
+
+def test_resolve_team_rejects_bad_sizes(data):
+    with pytest.raises(ValueError):
+        data.resolve_team([])
+    with pytest.raises(ValueError):
+        data.resolve_team(["Pikachu"] * (MAX_TEAM_SIZE + 1))
+    assert len(data.resolve_team(["Pikachu"] * MAX_TEAM_SIZE)) == MAX_TEAM_SIZE
+
+
+def test_resolve_team_rejects_unknown_names(data):
+    with pytest.raises(ValueError, match="Missingno"):
+        data.resolve_team(["Pikachu", "Missingno"])
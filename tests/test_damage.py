@@ -0,0 +1,73 @@
+import pytest
+
+from Damage import DamageCalculator, DUAL_EFFECTIVENESS, EFFECTIVENESS, TYPE_INDEX, NO_TYPE, DAMAGE_HEADERS, \
+    TARGET_HEADERS
+
+
+def dual(attacking, first, second=None):
+    return DUAL_EFFECTIVENESS[TYPE_INDEX[attacking], TYPE_INDEX[first],
+                              NO_TYPE if second is None else TYPE_INDEX[second]]
+
+
+@pytest.mark.parametrize("attacking, first, second, expected", [
+    ("Water", "Fire", "Rock", 4.0),
+    ("Electric", "Ground", None, 0.0),
+    ("Electric", "Water", "Ground", 0.0),
+    ("Ice", "Dragon", "Flying", 4.0),
+    ("Fire", "Water", "Dragon", 0.25),
+    ("Fighting", "Normal", "Ghost", 0.0),
+    ("Grass", "Water", "Flying", 1.0),
+    ("Normal", "Normal", None, 1.0),
+])
+def test_dual_type_effectiveness(attacking, first, second, expected):
+    assert dual(attacking, first, second) == expected
+
+
+def test_dual_effectiveness_is_the_product_of_single_types():
+    for attacking in TYPE_INDEX.values():
+        for first in TYPE_INDEX.values():
+            assert DUAL_EFFECTIVENESS[attacking, first, NO_TYPE] == EFFECTIVENESS[attacking, first]
+            for second in TYPE_INDEX.values():
+                assert DUAL_EFFECTIVENESS[attacking, first, second] == \
+                    EFFECTIVENESS[attacking, first] * EFFECTIVENESS[attacking, second]
+
+
+@pytest.fixture(scope="module")
+def calculator(db_path):
+    from Repository import PokedexRepository
+    repository = PokedexRepository(db_path)
+    yield DamageCalculator(repository)
+    repository.close()
+
+
+def test_pokemon_effectiveness_comes_from_its_types(calculator):
+    # Charizard is Fire/Flying, so Rock moves hit it four times as hard and Ground moves not at all
+    charizard = calculator.rows.row_of(6)
+    assert calculator.effectiveness[TYPE_INDEX["Rock"], charizard] == 4.0
+    assert calculator.effectiveness[TYPE_INDEX["Ground"], charizard] == 0.0
+
+
+def test_moves_against_is_sorted_strongest_first(calculator):
+    rows = calculator.moves_against(6, 9)
+    assert len(rows) == len(calculator.move_names)
+    assert all(len(row) == len(DAMAGE_HEADERS) for row in rows)
+    damage = [row[DAMAGE_HEADERS.index("Damage")] for row in rows]
+    assert damage == sorted(damage, reverse=True)
+
+    # Ground moves do nothing to a Flying defender
+    effectiveness = {row[0]: row[DAMAGE_HEADERS.index("Effectiveness")] for row in calculator.moves_against(9, 6)}
+    assert effectiveness["Earthquake"] == 0.0
+
+
+def test_move_against_all_is_sorted_most_damaged_first(calculator):
+    rows = calculator.move_against_all(25, "Thunderbolt")
+    assert len(rows) == len(calculator.ids)
+    assert all(len(row) == len(TARGET_HEADERS) for row in rows)
+    percent = [row[TARGET_HEADERS.index("% of HP")] for row in rows]
+    assert percent == sorted(percent, reverse=True)
+    assert {row[0]: row[TARGET_HEADERS.index("Effectiveness")] for row in rows}[50] == 0.0  # Diglett is Ground
+
+
+def test_unknown_move_is_rejected(calculator):
+    with pytest.raises(KeyError):
+        calculator.move_against_all(25, "Splash Dance")
@@ -0,0 +1,75 @@
+import pytest
+
+from Evolutions import EvolutionGraph, evolution_targets
+
+
+class FakeRepository:
+    """Serves (ID, Name, Evolution) rows for EvolutionGraph.build."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self, query, params=()):
+        return self.rows
+
+
+@pytest.fixture(scope="module")
+def graph(db_path):
+    from Repository import PokedexRepository
+    repository = PokedexRepository(db_path)
+    yield EvolutionGraph.build(repository)
+    repository.close()
+
+
+@pytest.mark.parametrize("evolution, targets", [
+    ("Ivysaur", ["Ivysaur"]),
+    ("Poliwrath/Politoed", ["Poliwrath", "Politoed"]),
+    ("N/A", []),
+    ("", []),
+    ("Mega Charizard X/Y", []),
+    ("Primal Kyogre", []),
+])
+def test_evolution_targets(evolution, targets):
+    assert evolution_targets(evolution) == targets
+
+
+@pytest.mark.parametrize("pokemon_id, targets", [
+    (72, [73]),  # Tentacool evolves into "Tentacruel", which the data spells Tentcruel
+    (172, [25]),  # Pichu evolves into "Pichachu", which is Pikachu
+    (236, [106, 107, 237]),  # Tyrogue's "Hitmonless" is Hitmonlee
+    (61, [62, 186]),  # Poliwhirl's "Politoed" is spelt Politoad in the data
+])
+def test_misspelt_evolutions_link_to_the_closest_name(graph, pokemon_id, targets):
+    assert graph.evolves_to(pokemon_id) == targets
+
+
+def test_family_lists_every_stage(graph):
+    assert graph.family(25) == [(172, "Pichu", 0), (25, "Pikachu", 1), (26, "Raichu", 2)]
+    assert graph.evolves_from(25) == [172]
+    assert graph.family(133)[0] == (133, "Eevee", 0)
+    assert {stage for _, _, stage in graph.family(133)[1:]} == {1}
+
+
+def test_unmatched_names_forms_and_self_links_create_no_link():
+    graph = EvolutionGraph.build(FakeRepository([
+        (1, "Bulbasaur", "Ivysaur"),
+        (2, "Ivysaur", "Zzyzxqq"),
+        (3, "Charizard", "Mega Charizard X/Y"),
+        (4, "Ditto", "Ditto"),
+    ]))
+    assert graph.forward == {1: [2]}
+    assert graph.family(2) == [(1, "Bulbasaur", 0), (2, "Ivysaur", 1)]
+    assert graph.family(3) == [(3, "Charizard", 0)]
+
+
+def test_cached_graph_is_reused_and_matches_the_built_one(db_path, tmp_path, monkeypatch):
+    from Repository import PokedexRepository
+    repository = PokedexRepository(db_path)
+    cache_path = str(tmp_path / "evolutions.json")
+    try:
+        built = EvolutionGraph.load(repository, cache_path)
+        monkeypatch.setattr(EvolutionGraph, "build", classmethod(lambda cls, repository: pytest.fail("rebuilt")))
+        cached = EvolutionGraph.load(repository, cache_path)
+    finally:
+        repository.close()
+    assert cached.forward == built.forward and cached.names == built.names
@@ -0,0 +1,118 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+from PyQt5.QtGui import QImage
+
+import SpriteArchive
+from ImageCache import IMAGES_DIR
+from Ingest import ingest_rows, ingest_artwork, POKEMON_COLUMNS, MOVE_COLUMNS
+from Migrations import migrate
+from Repository import DEFAULT_DB_PATH
+
+
+@pytest.fixture
+def ingest_db(tmp_path):
+    # Every test writes to the database, so each one gets its own migrated copy
+    path = str(tmp_path / "Data.db")
+    shutil.copyfile(DEFAULT_DB_PATH, path)
+    migrate(path)
+    return path
+
+
+def fetch(db_path, query, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+
+def current_rows(db_path):
+    return (fetch(db_path, f"SELECT {', '.join(POKEMON_COLUMNS)} FROM Pokemon ORDER BY ID"),
+            fetch(db_path, f"SELECT {', '.join(MOVE_COLUMNS)} FROM Moves ORDER BY Name"))
+
+
+def test_unchanged_rows_are_not_written(ingest_db):
+    pokemon_rows, move_rows = current_rows(ingest_db)
+    summary = ingest_rows(ingest_db, pokemon_rows, move_rows)
+    assert summary == {"pokemon": (len(pokemon_rows), 0, 0), "moves": (len(move_rows), 0, 0)}
+
+
+def test_changed_row_rewrites_its_types(ingest_db):
+    pokemon_rows, _ = current_rows(ingest_db)
+    pikachu = next(row for row in pokemon_rows if row[0] == 25)
+    pokemon_rows[pokemon_rows.index(pikachu)] = (25, pikachu[1], "Electric/Flying") + pikachu[3:]
+
+    assert ingest_rows(ingest_db, pokemon_rows)["pokemon"] == (len(pokemon_rows), 1, 0)
+    assert fetch(ingest_db, "SELECT Type FROM Pokemon WHERE ID = 25") == [("Electric/Flying",)]
+    assert fetch(ingest_db, "SELECT slot, type FROM PokemonTypes WHERE pokemon_id = 25 ORDER BY slot") == \
+        [(1, "Electric"), (2, "Flying")]
+
+
+def test_prune_removes_rows_missing_from_the_input(ingest_db):
+    pokemon_rows, move_rows = current_rows(ingest_db)
+    removed_id, removed_move = pokemon_rows[-1][0], move_rows[0][0]
+
+    summary = ingest_rows(ingest_db, pokemon_rows[:-1], move_rows[1:], prune=True)
+    assert summary["pokemon"][1:] == (0, 1) and summary["moves"][1:] == (0, 1)
+    assert fetch(ingest_db, "SELECT ID FROM Pokemon WHERE ID = ?", (removed_id,)) == []
+    assert fetch(ingest_db, "SELECT pokemon_id FROM PokemonTypes WHERE pokemon_id = ?", (removed_id,)) == []
+    assert fetch(ingest_db, "SELECT Name FROM Moves WHERE Name = ?", (removed_move,)) == []
+
+
+def test_rows_are_kept_without_prune(ingest_db):
+    pokemon_rows, _ = current_rows(ingest_db)
+    assert ingest_rows(ingest_db, pokemon_rows[:-1])["pokemon"][1:] == (0, 0)
+    assert fetch(ingest_db, "SELECT COUNT(*) FROM Pokemon") == [(len(pokemon_rows),)]
+
+
+@pytest.fixture
+def artwork(qapp, tmp_path):
+    # Source artwork and the directories the app loads from, all inside the test's own directory
+    source_dir = tmp_path / "Source"
+    source_dir.mkdir()
+    for pokemon_id in (1, 4):
+        shutil.copyfile(os.path.join(IMAGES_DIR, f"{pokemon_id}.jpg"), source_dir / f"{pokemon_id}.jpg")
+    images_dir = tmp_path / "Images"
+    images_dir.mkdir()
+    return {"source_dir": str(source_dir), "images_dir": str(images_dir),
+            "thumbnails_dir": str(tmp_path / "thumbnails"), "archive_path": str(tmp_path / "Sprites.pak")}
+
+
+def replace_with_red(path):
+    image = QImage(200, 200, QImage.Format_RGB32)
+    image.fill(0xff0000)
+    image.save(str(path), "PNG" if str(path).endswith(".png") else "JPG")
+
+
+def test_artwork_is_reencoded_only_when_its_hash_changes(ingest_db, artwork):
+    assert ingest_artwork(ingest_db, max_workers=1, **artwork)["images"] == (2, 2, 0)
+    assert ingest_artwork(ingest_db, max_workers=1, **artwork)["images"] == (2, 0, 0)
+
+    replace_with_red(os.path.join(artwork["source_dir"], "4.jpg"))
+    assert ingest_artwork(ingest_db, max_workers=1, **artwork)["images"] == (2, 1, 0)
+    color = QImage(os.path.join(artwork["images_dir"], "4.jpg")).pixelColor(50, 50)
+    assert color.red() > 200 and color.green() < 50
+
+
+def test_full_size_archive_keeps_its_full_images(ingest_db, artwork, monkeypatch):
+    ingest_artwork(ingest_db, max_workers=1, **artwork)
+    SpriteArchive.build_archive(artwork["images_dir"], artwork["archive_path"], full_size=SpriteArchive.FULL_SIZE,
+                                max_workers=1)
+
+    # Only the edited image is encoded again; the other entry is copied from the archive
+    encoded = []
+    encode_sprite = SpriteArchive.encode_sprite
+    monkeypatch.setattr(SpriteArchive, "encode_sprite", lambda path, *sizes: encoded.append(path) or
+                        encode_sprite(path, *sizes))
+    replace_with_red(os.path.join(artwork["source_dir"], "4.jpg"))
+    assert ingest_artwork(ingest_db, max_workers=1, **artwork)["packed"] == 2
+    assert [os.path.basename(path) for path in encoded] == ["4.jpg"]
+
+    archive = SpriteArchive.SpriteArchive(artwork["archive_path"], images_dir=artwork["images_dir"])
+    try:
+        assert archive.has_full_size() and archive.full_data(1) is not None
+    finally:
+        archive.close()
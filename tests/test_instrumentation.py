@@ -0,0 +1,53 @@
+import builtins
+import sys
+
+import Instrumentation
+from Instrumentation import memory_usage
+
+
+class Usage:
+    ru_maxrss = 200 * 1024
+
+
+class FakeResource:
+    RUSAGE_SELF = 0
+
+    @staticmethod
+    def getrusage(who):
+        return Usage
+
+
+def without_proc(monkeypatch):
+    real_open = builtins.open
+
+    def open_without_proc(path, *args, **kwargs):
+        if str(path).startswith("/proc/"):
+            raise FileNotFoundError(path)
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr(builtins, "open", open_without_proc)
+
+
+def test_getrusage_is_reported_as_peak_kb(monkeypatch):
+    without_proc(monkeypatch)
+    monkeypatch.setitem(sys.modules, "resource", FakeResource)
+    monkeypatch.setattr(Instrumentation.sys, "platform", "linux")
+    assert memory_usage() == (200 * 1024, "peak")
+
+
+def test_getrusage_bytes_are_converted_on_macos(monkeypatch):
+    without_proc(monkeypatch)
+    monkeypatch.setitem(sys.modules, "resource", FakeResource)
+    monkeypatch.setattr(Instrumentation.sys, "platform", "darwin")
+    assert memory_usage() == (200, "peak")
+
+
+def test_memory_is_unknown_without_proc_or_resource(monkeypatch):
+    without_proc(monkeypatch)
+    monkeypatch.setitem(sys.modules, "resource", None)
+    assert memory_usage() == (None, None)
+
+
+def test_proc_gives_current_resident_memory():
+    memory, kind = memory_usage()
+    if sys.platform.startswith("linux"):
+        assert kind == "resident" and memory > 0
@@ -0,0 +1,28 @@
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+from Migrations import MIGRATIONS, migrate
+from Repository import DEFAULT_DB_PATH
+from conftest import ROOT
+
+
+def test_concurrent_migrations_apply_each_step_once(tmp_path):
+    # Separate processes opening the same fresh copy, like two Pokedex.py jobs started together
+    path = tmp_path / "Data.db"
+    shutil.copyfile(DEFAULT_DB_PATH, path)
+    command = [sys.executable, "-c", f"import Migrations; Migrations.migrate({str(path)!r})"]
+    processes = [subprocess.Popen(command, cwd=ROOT, stderr=subprocess.PIPE, text=True) for _ in range(4)]
+    for process in processes:
+        assert process.wait() == 0, process.stderr.read()
+
+    conn = sqlite3.connect(path)
+    versions = [version for version, in conn.execute("SELECT version FROM SchemaVersion ORDER BY version")]
+    conn.close()
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+
+
+def test_migrated_database_is_left_unchanged(db_path):
+    migrate(db_path)
+    assert migrate(db_path) == len(MIGRATIONS)
@@ -0,0 +1,51 @@
+import pytest
+
+from NameIndex import NameIndex, bounded_edit_distance
+
+
+NAMES = ["Pikachu", "Pichu", "Pidgey", "Pidgeotto", "Pidgeot", "Charmander", "Charmeleon", "Charizard", "Mr. Mime",
+         "Bulbasaur"]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(NAMES)
+
+
+@pytest.mark.parametrize("query", ["pik", "PIK", "Pik", "pIkAcHu"])
+def test_prefix_ignores_case_and_keeps_the_spelling(index, query):
+    assert index.search(query) == ["Pikachu"]
+
+
+def test_prefix_matches_are_alphabetical(index):
+    assert index.search("pi") == ["Pichu", "Pidgeot", "Pidgeotto", "Pidgey", "Pikachu"]
+    assert index.search("char") == ["Charizard", "Charmander", "Charmeleon"]
+
+
+def test_fuzzy_matches_are_closest_first(index):
+    assert index.search("Charmandr") == ["Charmander"]
+    assert index.search("chamreleon")[0] == "Charmeleon"
+    assert index.fuzzy("pidgeott")[:2] == ["Pidgeot", "Pidgeotto"]
+    assert index.search("BULBSAUR") == ["Bulbasaur"]
+
+
+def test_fuzzy_allows_one_typo_in_short_queries(index):
+    assert index.search("pxch") == []
+    assert index.fuzzy("pxch", max_distance=2) == ["Pichu"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_limit_is_respected(index, limit):
+    assert index.search("p", limit=limit) == index.search("p")[:limit]
+    assert len(index.fuzzy("pidgeo", limit=limit)) <= limit
+
+
+def test_empty_and_unknown_queries_find_nothing(index):
+    assert index.search("   ") == []
+    assert index.search("zzzzzz") == []
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("kitten", "sitting", 3) == 3
+    assert bounded_edit_distance("kitten", "sitting", 2) == 3
+    assert bounded_edit_distance("abc", "abc", 0) == 0
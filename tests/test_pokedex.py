@@ -0,0 +1,21 @@
+import pytest
+
+from Pokedex import main, resolve_rows
+
+
+def test_missing_database_is_reported_not_created(tmp_path, capsys):
+    db_path = tmp_path / "Missing.db"
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--db", str(db_path)])
+    assert exit_info.value.code == 2
+    assert "no database" in capsys.readouterr().err
+    assert not db_path.exists()
+
+
+def test_resolve_rows_accepts_ids_and_names_in_any_case():
+    assert resolve_rows([" 25", "BULBASAUR "], [1, 25], ["Bulbasaur", "Pikachu"]) == [1, 0]
+
+
+def test_resolve_rows_names_the_unknown_key():
+    with pytest.raises(ValueError, match="Missingno"):
+        resolve_rows(["25", "Missingno"], [25], ["Pikachu"])
@@ -0,0 +1,63 @@
+import pytest
+
+from QueryPlanner import plan_search, GENERATION_RANGES
+
+
+def test_id_is_a_primary_key_lookup():
+    assert plan_search(" 25 ") == ("SELECT * FROM Pokemon WHERE ID = ?", (25,))
+
+
+@pytest.mark.parametrize("text", ["Mr. Mime", "Type: Null", "type: null"])
+def test_names_with_spaces_and_colons_are_names(text):
+    query, params = plan_search(text)
+    assert query == "SELECT * FROM Pokemon WHERE Name = ? COLLATE NOCASE ORDER BY ID"
+    assert params == (text,)
+
+
+def test_type_criteria_are_normalized():
+    query, params = plan_search("type:fire TYPE:Flying")
+    assert query.count("PokemonTypes") == 2
+    assert params == ("Fire", "Flying")
+
+
+@pytest.mark.parametrize("text, bounds", [
+    ("gen:1", (1, 151)),
+    ("gen:1-3", (1, 386)),
+    ("gen:3-1", (1, 386)),
+    (f"generation:{len(GENERATION_RANGES)}", GENERATION_RANGES[len(GENERATION_RANGES)]),
+])
+def test_generation_bounds(text, bounds):
+    query, params = plan_search(text)
+    assert "ID BETWEEN ? AND ?" in query
+    assert params == bounds
+
+
+@pytest.mark.parametrize("text", ["gen:0", f"gen:1-{len(GENERATION_RANGES) + 1}", "gen:one"])
+def test_generations_out_of_range_are_rejected(text):
+    with pytest.raises(ValueError):
+        plan_search(text)
+
+
+@pytest.mark.parametrize("text, condition, value", [
+    ("speed>=100", "Speed >= ?", 100),
+    ("atk<50", "Attack < ?", 50),
+    ("hp=100", "HP = ?", 100),
+    ("spdef<=80", "Spdef <= ?", 80),
+    ("total>600", "Total > ?", 600),
+])
+def test_stat_operators(text, condition, value):
+    query, params = plan_search(text)
+    assert condition in query
+    assert params == (value,)
+
+
+def test_criteria_and_name_combine_into_one_query():
+    query, params = plan_search("type:fire gen:1 char")
+    assert query.count("SELECT") == 2  # The outer query and the PokemonTypes subquery
+    assert params == ("Fire", 1, 151, "char")
+
+
+@pytest.mark.parametrize("text", ["color:red", "luck>5", "", "   "])
+def test_unknown_criteria_are_rejected(text):
+    with pytest.raises(ValueError):
+        plan_search(text)
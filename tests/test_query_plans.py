@@ -0,0 +1,24 @@
+import pytest
+
+from Repository import SEARCH_POKEMON_BY_TYPE, SEARCH_MOVES_BY_TYPE, build_move_filter
+from QueryPlanner import plan_search
+
+
+# Every search the app runs through an index, as (query, parameters)
+INDEXED_QUERIES = [
+    (SEARCH_POKEMON_BY_TYPE, ("Fire",)),
+    (SEARCH_MOVES_BY_TYPE, ("Fire",)),
+    build_move_filter(min_power=90, min_accuracy=100, max_accuracy=100),
+    build_move_filter(min_pp=20, sort_by="PP"),
+    ("SELECT * FROM Moves WHERE Name = ? COLLATE NOCASE", ("thunderbolt",)),
+    plan_search("pikachu"),
+    plan_search("Type: Null"),
+    plan_search("type:fire type:flying speed>=100"),
+    plan_search("total>=600 gen:1-3"),
+]
+
+
+@pytest.mark.parametrize("query, params", INDEXED_QUERIES)
+def test_query_uses_an_index(repository, query, params):
+    plan = repository.explain(query, params)
+    assert not [step for step in plan if step.startswith("SCAN")], f"Full scan in {query!r}: {plan}"
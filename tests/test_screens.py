@@ -0,0 +1,96 @@
+import pytest
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QApplication, QStackedWidget, QWidget
+
+from Core import MainWindow
+from Screens import ScreenRegistry
+
+
+def flush_deletes():
+    # Outside a running event loop, deleteLater only happens when deferred deletes are sent explicitly
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+@pytest.fixture
+def registry(qapp):
+    stacked_widget = QStackedWidget()
+    registry = ScreenRegistry(stacked_widget, capacity=2)
+    registry.evicted = []
+    for name in ("a", "b", "c"):
+        registry.register(name, QWidget, on_evict=lambda name=name: registry.evicted.append(name))
+    registry.register("pinned", QWidget, pinned=True)
+    yield registry
+    stacked_widget.deleteLater()
+    flush_deletes()
+
+
+def test_least_recently_shown_screen_is_evicted_and_freed(registry):
+    first = registry.show("a")
+    registry.show("b")
+    registry.show("c")
+    flush_deletes()
+    assert registry.evicted == ["a"]
+    assert list(registry.screens) == ["b", "c"]
+    assert sip.isdeleted(first)
+
+    # Showing an evicted screen builds a new widget for it
+    rebuilt = registry.show("a")
+    assert rebuilt is not first and not sip.isdeleted(rebuilt)
+    assert registry.evicted == ["a", "b"]
+
+
+def test_pinned_screen_is_kept_and_not_counted(registry):
+    pinned = registry.show("pinned")
+    for name in ("a", "b", "c", "a"):
+        registry.show(name)
+    assert "pinned" in registry.screens and registry.get("pinned") is pinned
+    assert len([name for name in registry.screens if name != "pinned"]) == 2
+
+
+def test_clear_evicts_every_screen(registry):
+    for name in ("pinned", "a", "b"):
+        registry.show(name)
+    registry.clear()
+    assert not registry.screens
+    assert sorted(registry.evicted) == ["a", "b"]
+
+
+@pytest.fixture
+def window(qapp, db_path):
+    window = MainWindow(db_path)
+    window.prefetcher.radius = 0
+    yield window
+    window.close()
+
+
+def test_evicted_app_screen_is_rebuilt(window):
+    # The app keeps every screen at its default capacity, so a lower one forces eviction of real screens
+    window.screens.capacity = 1
+    window.show_simulator_screen()
+    simulate_button = window.simulate_button
+    window.show_damage_screen()
+    flush_deletes()
+    assert "simulator" not in window.screens.screens and sip.isdeleted(simulate_button)
+
+    window.show_simulator_screen()
+    assert not sip.isdeleted(window.simulate_button) and window.simulate_button.isEnabled()
+
+
+def test_close_frees_the_screens(window):
+    window.show_search_screen()
+    window.show_damage_screen()
+    window.close()
+    assert not window.screens.screens
+
+
+def test_search_screen_keeps_the_colour_of_the_shown_pokemon(window):
+    window.show_search_screen()
+    window.fetch_pokemon_by_id(4)
+    window.tasks.wait_for_done()
+    themed = window.background.property(window.theme.property_name)
+
+    window.show_main_menu()
+    assert window.background.property(window.theme.property_name) != themed
+    window.show_search_screen()
+    assert window.background.property(window.theme.property_name) == themed
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+from Core import MainWindow
+
+
+@pytest.fixture
+def window(qapp, db_path):
+    window = MainWindow(db_path)
+    window.prefetcher.radius = 0  # Background prefetching would add its own queries
+    window.show_search_screen()
+    yield window
+    window.close()
+
+
+@pytest.mark.parametrize("search", ["25", "pikachu", "Mr. Mime", "Type: Null", "type:fire type:flying",
+                                    "speed>=120 gen:1-3", "missingno"])
+def test_search_is_one_round_trip(window, search):
+    window.search_bar.setText(search)
+    before = window.repository.query_count
+    window.search_pokemon()
+    window.tasks.wait_for_done()
+    assert window.repository.query_count - before == 1
+
+
+def test_type_null_is_found_by_name(window):
+    window.search_bar.setText("Type: Null")
+    window.search_pokemon()
+    window.tasks.wait_for_done()
+    assert window.current_pokemon_id == 772
+
+
+def test_database_errors_are_shown_instead_of_aborting(window, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(window.repository, "fetch_pokemon_by_id", locked)
+    monkeypatch.setattr(window.repository, "search_pokemon", locked)
+    window.fetch_pokemon_by_id(400)
+    window.tasks.wait_for_done()
+    assert "database is locked" in window.results_display.toPlainText()
+
+    window.search_bar.setText("pikachu")
+    window.search_pokemon()
+    window.tasks.wait_for_done()
+    assert "database is locked" in window.results_display.toPlainText()
+
+    monkeypatch.setattr(window.repository, "search_moves_by_type", locked)
+    window.show_move_search_screen()
+    window.move_type_combo_box.setCurrentText("Fire")
+    window.search_moves_by_type()
+    window.tasks.wait_for_done()
+    assert "database is locked" in window.move_results_display.toPlainText()
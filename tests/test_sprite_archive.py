@@ -0,0 +1,55 @@
+import os
+import shutil
+
+import pytest
+from PyQt5.QtGui import QImage
+
+from ImageCache import IMAGES_DIR, ThumbnailStore
+from SpriteArchive import SpriteArchive, build_archive, HEADER
+
+
+@pytest.fixture
+def images_dir(qapp, tmp_path):
+    images_dir = tmp_path / "Images"
+    images_dir.mkdir()
+    for pokemon_id in (1, 4):
+        shutil.copyfile(os.path.join(IMAGES_DIR, f"{pokemon_id}.jpg"), images_dir / f"{pokemon_id}.jpg")
+    return images_dir
+
+
+@pytest.fixture
+def archive(images_dir, tmp_path):
+    archive_path = str(tmp_path / "Sprites.pak")
+    build_archive(str(images_dir), archive_path, max_workers=1)
+    fallback = ThumbnailStore(str(images_dir), str(tmp_path / "thumbnails"))
+    archive = SpriteArchive(archive_path, fallback=fallback, images_dir=str(images_dir))
+    yield archive
+    archive.close()
+
+
+def test_packed_artwork_is_loaded_from_the_archive(archive, monkeypatch):
+    monkeypatch.setattr(archive.fallback, "load", lambda pokemon_id: pytest.fail("used the fallback"))
+    assert not archive.load(1).isNull()
+
+
+def test_edited_artwork_is_loaded_from_the_source(archive, images_dir):
+    # Replaces Bulbasaur with a plain red image, which the packed thumbnail is not
+    image = QImage(200, 200, QImage.Format_RGB32)
+    image.fill(0xff0000)
+    image.save(str(images_dir / "1.jpg"), "JPG")
+    color = archive.load(1).pixelColor(50, 50)
+    assert color.red() > 200 and color.green() < 50
+
+
+def test_packed_artwork_is_served_without_the_source(archive, images_dir, monkeypatch):
+    os.remove(images_dir / "4.jpg")
+    monkeypatch.setattr(archive.fallback, "load", lambda pokemon_id: pytest.fail("used the fallback"))
+    assert not archive.load(4).isNull()
+
+
+def test_truncated_archive_is_rejected(archive, tmp_path):
+    truncated_path = tmp_path / "Truncated.pak"
+    with open(archive.archive_path, "rb") as source:
+        truncated_path.write_bytes(source.read(HEADER.size + 4))
+    with pytest.raises(ValueError):
+        SpriteArchive(str(truncated_path))
@@ -0,0 +1,85 @@
+import pytest
+
+from Stats import StatsEngine
+
+
+class FakeRepository:
+    """Serves a handful of Pokémon rows in the column order StatsEngine selects them."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self, query, params=()):
+        return self.rows
+
+
+# ID, Name, HP, Attack, Def, Spatk, Spdef, Speed, Total; 2 and 3 tie on every stat
+ROWS = [
+    (1, "Low", 10, 10, 10, 10, 10, 10, 60),
+    (2, "Twin", 50, 60, 40, 30, 20, 80, 280),
+    (3, "Twin Copy", 50, 60, 40, 30, 20, 80, 280),
+    (4, "Doubled", 100, 120, 80, 60, 40, 160, 560),
+    (7, "High", 90, 150, 90, 150, 90, 150, 720),
+]
+
+
+@pytest.fixture
+def engine():
+    return StatsEngine(FakeRepository(ROWS))
+
+
+def test_percentile_is_the_share_at_or_below_the_stat(engine):
+    assert engine.percentiles_of(1)["HP"] == pytest.approx(20.0)
+    assert engine.percentiles_of(4)["HP"] == pytest.approx(100.0)
+    assert engine.percentiles_of(7)["Speed"] == pytest.approx(80.0)
+
+
+def test_percentiles_match_the_whole_set(repository):
+    engine = StatsEngine(repository)
+    for pokemon_id in (1, 25, 150, repository.max_id):
+        row = engine.stats[engine.rows.row_of(pokemon_id)]
+        expected = (engine.stats <= row).mean(axis=0) * 100
+        assert list(engine.percentiles_of(pokemon_id).values()) == pytest.approx(expected.tolist())
+
+
+def test_ties_share_a_percentile_and_a_score(engine):
+    assert engine.percentiles_of(2) == engine.percentiles_of(3)
+    assert engine.percentiles_of(2)["Speed"] == pytest.approx(60.0)
+
+    ids, scores = engine.rank("Speed", top=len(ROWS))
+    assert scores[ids.index(2)] == scores[ids.index(3)]
+    assert abs(ids.index(2) - ids.index(3)) == 1
+
+
+def test_rank_orders_by_weighted_score(engine):
+    ids, scores = engine.rank("Physical attacker", top=3)
+    assert ids[:2] == [7, 4] and ids[2] in (2, 3)
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == 150 + 150
+
+    ids, scores = engine.rank({"HP": 1.0}, top=2, descending=False)
+    assert ids[0] == 1 and scores == sorted(scores)
+
+
+def test_similar_never_lists_the_pokemon_itself(engine):
+    for metric in ("cosine", "euclidean"):
+        for pokemon_id, *_ in ROWS:
+            ids, distances = engine.similar(pokemon_id, count=len(ROWS), metric=metric)
+            assert pokemon_id not in ids
+            assert len(ids) == len(ROWS) - 1
+            assert distances == sorted(distances)
+
+
+def test_similar_finds_the_same_spread(engine):
+    # Doubled has Twin's spread at twice the size, which cosine ignores and euclidean does not
+    ids, distances = engine.similar(4, count=2, metric="cosine")
+    assert set(ids) == {2, 3} and distances == pytest.approx([0.0, 0.0])
+    assert engine.similar(2, count=1, metric="euclidean")[0] == [3]
+
+
+def test_unknown_pokemon_and_metric_are_rejected(engine):
+    with pytest.raises(KeyError):
+        engine.percentiles_of(5)
+    with pytest.raises(ValueError):
+        engine.similar(1, metric="manhattan")
+